@@ -1,5 +1,11 @@
 import argparse
+import functools
+import hashlib
+import json
+import logging
 import os
+import random
+import sqlite3
 import sys
 from openai import OpenAI
 from pathlib import Path
@@ -8,16 +14,35 @@ import re
 import asyncio
 import aiofiles
 from openai import AsyncOpenAI
+try:
+    # Only in newer openai releases, and needs the openai[aiohttp] extra
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
 from dotenv import load_dotenv
-import requests
 import aiohttp
+import httpx
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+BANNER = "=" * 80
+
 # DeepSeek API configuration
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/"
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_MODELS_URL = "https://api.deepseek.com/v1/models"
+DEEPSEEK_VALIDATION_TTL = 24 * 60 * 60  # Re-validate the key at most once a day
+
+# Maximum number of translation requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Precompiled patterns used by the filename and formatting helpers
+_SENT_RE = re.compile(r'[.!?]+')
+_NONALNUM = re.compile(r'[^a-zA-Z0-9\s]')
+_WS_RE = re.compile(r'\s+')
 
 def get_model_selection():
     """Get user's model selection"""
@@ -37,25 +62,28 @@ def get_model_selection():
 def get_first_sentence(text):
     """Extract the first sentence from text"""
     # Split by common sentence endings
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENT_RE.split(text)
     # Get the first non-empty sentence and clean it
     first_sentence = next((s.strip() for s in sentences if s.strip()), "translation")
     # Replace spaces with underscores and remove special characters
-    return re.sub(r'[^a-zA-Z0-9\s]', '', first_sentence).replace(' ', '_')[:50]
+    return _NONALNUM.sub('', first_sentence).replace(' ', '_')[:50]
 
 def get_text_from_terminal():
-    """Get text input directly from terminal"""
-    print("\nEnter or paste your text below (Press Enter twice to finish):")
-    print("-" * 50)
-    lines = []
+    """Get text input directly from terminal, or all at once when stdin is piped"""
     try:
-        while True:
-            line = input()
-            if line.strip() == "" and lines:  # Empty line and we have some content
-                break
-            lines.append(line)
-            
-        text = "\n".join(lines).strip()
+        if not sys.stdin.isatty():
+            text = sys.stdin.read().strip()
+        else:
+            print("\nEnter or paste your text below (Press Enter twice to finish):")
+            print("-" * 50)
+            lines = []
+            while True:
+                line = input()
+                if line.strip() == "" and lines:  # Empty line and we have some content
+                    break
+                lines.append(line)
+            text = "\n".join(lines).strip()
+        
         if not text:
             print("No text entered. Please run the script again.")
             sys.exit(1)
@@ -69,8 +97,30 @@ def get_text_from_terminal():
 
 class TranslationError(Exception):
     """Custom exception for translation errors"""
-    pass
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
+def get_retry_after(error):
+    """Return the server-requested Retry-After delay in seconds, if any"""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            retry_after = headers.get("Retry-After")
+    try:
+        return max(0.0, float(retry_after)) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def get_retry_delay(attempt, error=None, base_delay=1, max_delay=30):
+    """Exponential backoff with full jitter, honoring Retry-After when present"""
+    retry_after = get_retry_after(error)
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+@functools.lru_cache(maxsize=32)
 def get_enhanced_system_message(target_language):
     """Get enhanced system message for more localized translations"""
     base_message = """You are a professional translator for {target_language}. Follow these guidelines:
@@ -96,6 +146,13 @@ Important: Return the translation as one continuous paragraph with sentences sep
     
     return message
 
+def get_translation_messages(text, target_language):
+    """Build the chat messages for translating text into target_language"""
+    return [
+        {"role": "system", "content": get_enhanced_system_message(target_language)},
+        {"role": "user", "content": text}
+    ]
+
 def clean_translation(translation):
     """Clean up translation response to remove explanations"""
     # Get first non-empty line that's not a heading
@@ -109,25 +166,53 @@ def clean_translation(translation):
     
     return translation.strip()
 
-def translate_text(text, target_language, api_key=None, model="gpt-4o", max_retries=3, retry_delay=2):
+def open_translation_cache(output_dir):
+    """Open (or create) the on-disk cache of previous translations"""
+    cache = sqlite3.connect(output_dir / ".translations.cache.db")
+    cache.execute("CREATE TABLE IF NOT EXISTS t(k TEXT PRIMARY KEY, v TEXT)")
+    return cache
+
+def get_cache_key(model, messages, temperature, max_tokens):
+    """Hash every request parameter that affects the translation"""
+    request = json.dumps({
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }, sort_keys=True)
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def get_cached_translation(cache, cache_key):
+    """Return a previously stored translation, or None on a cache miss"""
+    if cache is None:
+        return None
+    row = cache.execute("SELECT v FROM t WHERE k = ?", (cache_key,)).fetchone()
+    return row[0] if row else None
+
+def store_cached_translation(cache, cache_key, translation):
+    """Store a successful translation in the cache"""
+    if cache is None:
+        return
+    try:
+        cache.execute("INSERT OR REPLACE INTO t(k, v) VALUES (?, ?)", (cache_key, translation))
+        cache.commit()
+    except sqlite3.Error as e:
+        logger.warning("Error writing translation cache: %s", e)
+
+def translate_text(text, target_language, api_key=None, model="gpt-4o", max_retries=3, retry_delay=1):
     """Translate text to target language using OpenAI API with retry mechanism"""
     client = OpenAI(api_key=api_key)
+    messages = get_translation_messages(text, target_language)
     
     for attempt in range(max_retries):
         try:
-            print(f"\n{'='*80}")
-            print(f"Translating to {target_language}... (Attempt {attempt + 1}/{max_retries})")
-            print(f"{'='*80}")
+            logger.debug(BANNER)
+            logger.info("Translating to %s (attempt %d/%d)", target_language, attempt + 1, max_retries)
             start_time = time.time()
             
-            # Use enhanced system message
-            system_message = get_enhanced_system_message(target_language)
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
+                messages=messages,
                 temperature=0.3,
                 max_tokens=1000
             )
@@ -138,58 +223,49 @@ def translate_text(text, target_language, api_key=None, model="gpt-4o", max_retr
             if not translation.strip():
                 raise TranslationError("Received empty translation")
                 
-            # Success - print results and return
+            # Success - log results and return
             elapsed_time = time.time() - start_time
-            print_translation_results(text, translation, target_language, elapsed_time)
+            log_translation_results(text, translation, target_language, elapsed_time)
             return translation
             
         except Exception as e:
-            error_msg = str(e)
-            print(f"\n{'='*50}")
-            print(f"❌ Error on attempt {attempt + 1}/{max_retries}: {error_msg}")
+            logger.warning("Error translating to %s (attempt %d/%d): %s", target_language, attempt + 1, max_retries, e)
             
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)  # Exponential backoff
-                print(f"Retrying in {wait_time} seconds...")
-                print(f"{'='*50}\n")
+                wait_time = get_retry_delay(attempt, e, retry_delay)
+                logger.info("Retrying %s in %.1f seconds...", target_language, wait_time)
                 time.sleep(wait_time)
             else:
-                print(f"Failed after {max_retries} attempts")
-                print(f"{'='*50}\n")
+                logger.error("Failed %s after %d attempts", target_language, max_retries)
                 return None
 
-def print_translation_results(original_text, translation, target_language, elapsed_time):
-    """Helper function to print translation results"""
-    print(f"\nOriginal text:")
-    print("-" * 50)
-    print(original_text)
-    print("-" * 50)
-    print(f"\n{target_language} translation:")
-    print("-" * 50)
-    print(translation)
-    print("-" * 50)
-    print(f"\nTranslation completed in {elapsed_time:.2f} seconds")
-    print(f"{'='*80}\n")
+def log_translation_results(original_text, translation, target_language, elapsed_time):
+    """Helper function to log translation results"""
+    logger.info("%s translation completed in %.2f seconds: %s", target_language, elapsed_time, translation)
+    if logger.isEnabledFor(logging.DEBUG):
+        separator = "-" * 50
+        logger.debug("Original text:\n%s\n%s\n%s", separator, original_text, separator)
+        logger.debug(BANNER)
 
-async def translate_text_async(text, target_language, api_key=None, model="gpt-4o", max_retries=3, retry_delay=2):
-    """Async version of translate_text"""
-    client = AsyncOpenAI(api_key=api_key)
+async def translate_text_async(text, target_language, client, model="gpt-4o", max_retries=3, retry_delay=1, cache=None):
+    """Async version of translate_text using a shared AsyncOpenAI client"""
+    messages = get_translation_messages(text, target_language)
+    
+    cache_key = get_cache_key(model, messages, 0.3, 1000)
+    cached_translation = get_cached_translation(cache, cache_key)
+    if cached_translation:
+        logger.info("Using cached %s translation", target_language)
+        return target_language, cached_translation
     
     for attempt in range(max_retries):
         try:
-            print(f"\n{'='*80}")
-            print(f"Starting translation to {target_language}... (Attempt {attempt + 1}/{max_retries})")
-            print(f"{'='*80}")
+            logger.debug(BANNER)
+            logger.info("Starting translation to %s (attempt %d/%d)", target_language, attempt + 1, max_retries)
             start_time = time.time()
             
-            # Use enhanced system message
-            system_message = get_enhanced_system_message(target_language)
             response = await client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
+                messages=messages,
                 temperature=0.3,
                 max_tokens=1000
             )
@@ -199,46 +275,66 @@ async def translate_text_async(text, target_language, api_key=None, model="gpt-4
             
             if not translation.strip():
                 raise TranslationError("Received empty translation")
+            
+            store_cached_translation(cache, cache_key, translation)
                 
             elapsed_time = time.time() - start_time
-            print_translation_results(text, translation, target_language, elapsed_time)
+            log_translation_results(text, translation, target_language, elapsed_time)
             return target_language, translation
             
         except Exception as e:
-            error_msg = str(e)
-            print(f"\n{'='*50}")
-            print(f"❌ Error translating to {target_language} (Attempt {attempt + 1}/{max_retries}): {error_msg}")
+            logger.warning("Error translating to %s (attempt %d/%d): %s", target_language, attempt + 1, max_retries, e)
             
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
-                print(f"Retrying {target_language} in {wait_time} seconds...")
-                print(f"{'='*50}\n")
+                wait_time = get_retry_delay(attempt, e, retry_delay)
+                logger.info("Retrying %s in %.1f seconds...", target_language, wait_time)
                 await asyncio.sleep(wait_time)
             else:
-                print(f"Failed {target_language} after {max_retries} attempts")
-                print(f"{'='*50}\n")
+                logger.error("Failed %s after %d attempts", target_language, max_retries)
                 return target_language, None
 
-async def save_translation_async(output_file, consolidated_file_path, general_consolidated_path, lang_code, translation, filename_prefix, verbose=False):
-    """Async function to save translation to files"""
+def create_openai_client(api_key):
+    """Create the AsyncOpenAI client shared by all OpenAI requests"""
+    if DefaultAioHttpClient is None:
+        # Older openai (requirements.txt pins 1.12.0): use its default httpx transport
+        return AsyncOpenAI(api_key=api_key)
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=DefaultAioHttpClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+    )
+
+def create_deepseek_session():
+    """Create the aiohttp session shared by all DeepSeek requests"""
+    return aiohttp.ClientSession(
+        headers={
+            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        # Separate connect/read budgets so a slow first byte doesn't eat the connect timeout
+        timeout=aiohttp.ClientTimeout(total=60, connect=10, sock_read=55),
+        # Keep idle connections well past aiohttp's 15s default so retries reuse them
+        connector=aiohttp.TCPConnector(
+            limit=64,
+            limit_per_host=16,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+            ttl_dns_cache=300
+        )
+    )
+
+async def warm_up_connection(client=None, session=None):
+    """Open the HTTPS connection to the provider ahead of the real requests"""
     try:
-        # Format translation as a single paragraph
-        formatted_translation = translation.replace('\n', '  ').replace('  ', ' ').strip()
-        
-        # Save to filename-specific consolidated file
-        async with aiofiles.open(consolidated_file_path, "a", encoding="utf-8") as consolidated_file:
-            escaped_translation = formatted_translation.replace('"', '\\"')
-            await consolidated_file.write(f'[{lang_code}] "{escaped_translation}"\n\n')
-        
-        # Save to general all_translations.txt file
-        async with aiofiles.open(general_consolidated_path, "a", encoding="utf-8") as general_file:
-            escaped_translation = formatted_translation.replace('"', '\\"')
-            await general_file.write(f'[{lang_code}] "{escaped_translation}"\n\n')
-            
-        return True
-    except Exception as e:
-        print(f"Error saving translation for {lang_code}: {str(e)}")
-        return False
+        if client is not None:
+            await asyncio.wait_for(client.models.list(), timeout=2)
+        if session is not None:
+            timeout = aiohttp.ClientTimeout(total=2)
+            async with session.head(DEEPSEEK_BASE_URL, allow_redirects=False, timeout=timeout):
+                pass
+    except Exception:
+        pass  # Best effort only; a failed warm-up must never abort the run
 
 async def process_translations(text, languages, all_languages, api_key, model, output_dir, filename_prefix, args, model_choice):
     """Process all translations concurrently"""
@@ -248,210 +344,174 @@ async def process_translations(text, languages, all_languages, api_key, model, o
     general_consolidated_path = output_dir / "all_translations.txt"
     
     # Format original text as a single paragraph and ensure it's included
-    formatted_text = text.replace('\n', ' ').replace('  ', ' ').strip()
+    formatted_text = _WS_RE.sub(' ', text).strip()
+    entries = [f'[EN] "{formatted_text}"']
     
-    # Overwrite all_translations.txt instead of appending
-    async with aiofiles.open(consolidated_file_path, "w", encoding="utf-8") as file1, \
-              aiofiles.open(general_consolidated_path, "w", encoding="utf-8") as file2:
-        await file1.write(f'[EN] "{formatted_text}"\n\n')
-        await file2.write(f'[EN] "{formatted_text}"\n\n')
+    # One client (and one connection pool) shared by every language
+    cache = open_translation_cache(output_dir)
+    client = None
+    session = None
+    if model_choice == "1":
+        client = create_openai_client(api_key)
+    else:
+        session = create_deepseek_session()
     
-    # Create tasks for each language
-    for lang_code in languages:
-        if lang_code == "EN":
-            continue
-            
-        lang_name = all_languages.get(lang_code, lang_code)
-        if model_choice == "1":
-            tasks.append(translate_text_async(text, lang_name, api_key, model))
-        else:
-            tasks.append(translate_with_deepseek_async(text, lang_name))
+    # Bound in-flight requests to stay within provider rate limits
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
-    # Process translations with progress tracking
-    print(f"\nProcessing {len(tasks)} translations...")
-    results = []
-    for i, task in enumerate(tasks):
-        try:
-            result = await task
-            results.append(result)
-            print(f"Completed {i+1}/{len(tasks)} translations")
-        except Exception as e:
-            print(f"Error processing translation: {str(e)}")
-            results.append((None, None))
+    async def run(lang_code, coro):
+        async with semaphore:
+            _, translation = await coro
+            return lang_code, translation
+    
+    try:
+        # Connect before the fan-out so the first translation skips the TLS handshake
+        await warm_up_connection(client=client, session=session)
+        
+        # Create tasks for each language
+        for lang_code in languages:
+            if lang_code == "EN":
+                continue
+                
+            lang_name = all_languages.get(lang_code, lang_code)
+            if model_choice == "1":
+                tasks.append(run(lang_code, translate_text_async(text, lang_name, client, model, cache=cache)))
+            else:
+                tasks.append(run(lang_code, translate_with_deepseek_async(text, lang_name, session, cache=cache)))
+        
+        # Collect translations as they finish; file order is restored below
+        print(f"\nProcessing {len(tasks)} translations...")
+        translations = {}
+        for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+            try:
+                lang_code, translation = await task
+                translations[lang_code] = translation
+            except Exception as e:
+                logger.error("Error processing translation: %s", e)
+            print(f"Completed {completed}/{len(tasks)} translations")
+    finally:
+        cache.close()
+        if client is not None:
+            await client.close()
+        if session is not None:
+            await session.close()
     
     successful_translations = 0
-    for lang_name, translation in results:
+    for lang_code in languages:
+        translation = translations.get(lang_code)
         if translation:
-            lang_code = next(code for code, name in all_languages.items() if name == lang_name)
-            
-            # Removed individual file creation, only save to consolidated files
-            success = await save_translation_async(
-                None,  # No individual output file
-                consolidated_file_path,
-                general_consolidated_path,
-                lang_code,
-                translation,
-                filename_prefix,
-                args.verbose
-            )
-            
-            if success:
-                successful_translations += 1
-    
-    return successful_translations
-
-def translate_with_deepseek(text, target_language, max_retries=3, retry_delay=2):
-    """Translate text using DeepSeek API"""
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json"
-    }
+            # Format translation as a single paragraph
+            formatted_translation = _WS_RE.sub(' ', translation).strip()
+            escaped_translation = formatted_translation.replace('"', '\\"')
+            entries.append(f'[{lang_code}] "{escaped_translation}"')
+            successful_translations += 1
     
-    system_message = get_enhanced_system_message(target_language)
+    # Write each consolidated file in one go, overwriting any previous run
+    content = "".join(f"{entry}\n\n" for entry in entries)
+    for file_path in (consolidated_file_path, general_consolidated_path):
+        async with aiofiles.open(file_path, "w", encoding="utf-8") as file:
+            await file.write(content)
     
-    for attempt in range(max_retries):
-        try:
-            print(f"\n{'='*80}")
-            print(f"Translating to {target_language} using DeepSeek... (Attempt {attempt + 1}/{max_retries})")
-            print(f"{'='*80}")
-            start_time = time.time()
-            
-            data = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 1000
-            }
-            
-            response = requests.post(DEEPSEEK_API_URL, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            translation = result['choices'][0]['message']['content'].strip()
-            
-            if not translation.strip():
-                raise TranslationError("Received empty translation")
-                
-            elapsed_time = time.time() - start_time
-            print_translation_results(text, translation, target_language, elapsed_time)
-            return translation
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"\n{'='*50}")
-            print(f"❌ Error on attempt {attempt + 1}/{max_retries}: {error_msg}")
-            
-            if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
-                print(f"Retrying in {wait_time} seconds...")
-                print(f"{'='*50}\n")
-                time.sleep(wait_time)
-            else:
-                print(f"Failed after {max_retries} attempts")
-                print(f"{'='*50}\n")
-                return None
+    return successful_translations
 
-async def translate_with_deepseek_async(text, target_language, max_retries=3, retry_delay=2):
-    """Async version of translate_with_deepseek"""
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json"
+async def translate_with_deepseek_async(text, target_language, session, max_retries=3, retry_delay=1, cache=None):
+    """Translate text using the DeepSeek API over a shared aiohttp session"""
+    data = {
+        "model": "deepseek-chat",
+        "messages": get_translation_messages(text, target_language),
+        "temperature": 0.3,
+        "max_tokens": 1000
     }
     
-    system_message = get_enhanced_system_message(target_language)
+    cache_key = get_cache_key(data["model"], data["messages"], data["temperature"], data["max_tokens"])
+    cached_translation = get_cached_translation(cache, cache_key)
+    if cached_translation:
+        logger.info("Using cached %s translation", target_language)
+        return target_language, cached_translation
     
     for attempt in range(max_retries):
         try:
-            print(f"\n{'='*80}")
-            print(f"Starting translation to {target_language} using DeepSeek... (Attempt {attempt + 1}/{max_retries})")
-            print(f"{'='*80}")
+            logger.debug(BANNER)
+            logger.info("Starting translation to %s using DeepSeek (attempt %d/%d)", target_language, attempt + 1, max_retries)
             start_time = time.time()
             
-            data = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 1000
-            }
-            
-            # Add timeout to the request
-            timeout = aiohttp.ClientTimeout(total=60)  # 60 second timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                try:
-                    async with session.post(DEEPSEEK_API_URL, headers=headers, json=data) as response:
-                        if response.status != 200:
-                            error_text = await response.text()
-                            print(f"API Error: Status {response.status}, Response: {error_text}")
-                            raise TranslationError(f"API returned status {response.status}")
-                        
-                        result = await response.json()
-                        
-                except asyncio.TimeoutError:
-                    print(f"Request timed out after 60 seconds")
-                    raise TranslationError("Request timed out")
-                except aiohttp.ClientError as e:
-                    print(f"Network error: {str(e)}")
-                    raise TranslationError(f"Network error: {str(e)}")
+            # Timeout and auth headers are configured on the shared session
+            try:
+                async with session.post(DEEPSEEK_API_URL, json=data) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.warning("DeepSeek API error: status %d, response: %s", response.status, error_text)
+                        raise TranslationError(
+                            f"API returned status {response.status}",
+                            retry_after=response.headers.get("Retry-After")
+                        )
+                    
+                    result = await response.json()
                     
+            except asyncio.TimeoutError:
+                raise TranslationError("Request timed out")
+            except aiohttp.ClientError as e:
+                raise TranslationError(f"Network error: {str(e)}")
+                
             translation = result['choices'][0]['message']['content'].strip()
             
             if not translation.strip():
                 raise TranslationError("Received empty translation")
+            
+            store_cached_translation(cache, cache_key, translation)
                 
             elapsed_time = time.time() - start_time
-            print_translation_results(text, translation, target_language, elapsed_time)
+            log_translation_results(text, translation, target_language, elapsed_time)
             return target_language, translation
             
         except Exception as e:
-            error_msg = str(e)
-            print(f"\n{'='*50}")
-            print(f"❌ Error translating to {target_language} (Attempt {attempt + 1}/{max_retries}): {error_msg}")
+            logger.warning("Error translating to %s (attempt %d/%d): %s", target_language, attempt + 1, max_retries, e)
             
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
-                print(f"Retrying {target_language} in {wait_time} seconds...")
-                print(f"{'='*50}\n")
+                wait_time = get_retry_delay(attempt, e, retry_delay)
+                logger.info("Retrying %s in %.1f seconds...", target_language, wait_time)
                 await asyncio.sleep(wait_time)
             else:
-                print(f"Failed {target_language} after {max_retries} attempts")
-                print(f"{'='*50}\n")
+                logger.error("Failed %s after %d attempts", target_language, max_retries)
                 return target_language, None
 
-async def validate_deepseek_api_key():
-    """Validate the DeepSeek API key by making a simple request"""
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json"
-    }
+async def validate_deepseek_api_key(session, output_dir):
+    """Validate the DeepSeek API key, skipping the check if it passed in the last 24 hours"""
+    # Runs on a short-lived session before the text is entered, so it can't prime the
+    # translations' connection; process_translations warms up its own session instead
+    marker_path = output_dir / ".deepseek_validated"
+    key_hash = hashlib.sha256((DEEPSEEK_API_KEY or "").encode("utf-8")).hexdigest()
     
-    data = {
-        "model": "deepseek-chat",
-        "messages": [
-            {"role": "user", "content": "Hello"}
-        ],
-        "max_tokens": 5
-    }
+    try:
+        marker_age = time.time() - marker_path.stat().st_mtime
+        if marker_age < DEEPSEEK_VALIDATION_TTL and marker_path.read_text() == key_hash:
+            # Validated recently: no network call needed
+            return True
+    except OSError:
+        pass  # No previous validation recorded
     
     try:
         timeout = aiohttp.ClientTimeout(total=10)  # 10 second timeout for validation
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(DEEPSEEK_API_URL, headers=headers, json=data) as response:
-                if response.status == 401:
-                    print("❌ Invalid DeepSeek API key. Please check your API key.")
-                    return False
-                elif response.status != 200:
-                    print(f"❌ DeepSeek API error: Status {response.status}")
-                    return False
-                return True
+        async with session.get(DEEPSEEK_MODELS_URL, timeout=timeout) as response:
+            if response.status == 401:
+                print("❌ Invalid DeepSeek API key. Please check your API key.")
+                return False
+            elif response.status != 200:
+                print(f"❌ DeepSeek API error: Status {response.status}")
+                return False
     except Exception as e:
         print(f"❌ Error validating DeepSeek API key: {str(e)}")
         return False
+    
+    # Record the successful check (the write also refreshes the mtime)
+    marker_path.write_text(key_hash)
+    print("✅ DeepSeek API key validated successfully")
+    return True
+
+async def check_deepseek_api_key(output_dir):
+    """Validate the DeepSeek API key on a short-lived session before any text is entered"""
+    async with create_deepseek_session() as session:
+        return await validate_deepseek_api_key(session, output_dir)
 
 def main():
     parser = argparse.ArgumentParser(description="Translate text to multiple languages using OpenAI or DeepSeek API")
@@ -462,6 +522,11 @@ def main():
     
     args = parser.parse_args()
     
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
     print("\nInitializing translation process...")
     
     # Get model selection
@@ -479,13 +544,12 @@ def main():
         print("✅ OpenAI API key found successfully")
     else:
         api_key = DEEPSEEK_API_KEY
-        print("✅ Using DeepSeek API key")
-        
-        # Validate DeepSeek API key
-        if not asyncio.run(validate_deepseek_api_key()):
-            print("Please check your DeepSeek API key and try again.")
+        if not api_key:
+            print("\n❌ Error: No DeepSeek API key found. Please:")
+            print("1. Create a .env file with DEEPSEEK_API_KEY=your-key")
+            print("2. Set the DEEPSEEK_API_KEY environment variable")
             sys.exit(1)
-        print("✅ DeepSeek API key validated successfully")
+        print("✅ Using DeepSeek API key")
     
     # Set default output directory in the same folder as the script
     script_dir = Path(__file__).parent
@@ -493,6 +557,11 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
     print(f"✅ Output directory created/verified at: {output_dir}")
     
+    # Check the DeepSeek key before asking for the text so a bad key fails fast
+    if model_choice != "1" and not asyncio.run(check_deepseek_api_key(output_dir)):
+        print("Please check your DeepSeek API key and try again.")
+        sys.exit(1)
+    
     # Get input text from terminal
     print("\nPlease enter your text to translate...")
     text = get_text_from_terminal()
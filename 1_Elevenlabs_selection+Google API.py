@@ -9,6 +9,13 @@ import argparse
 import sys
 import requests
 import unicodedata
+import hashlib
+import json
+import shutil
+import sqlite3
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Initialize Google Text-to-Speech client
 google_client = texttospeech.TextToSpeechClient()
@@ -44,6 +51,15 @@ language_codes = {
     "Cantonese": "HK",
 }
 
+# Cached voice files older than this are evicted
+TTS_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Number of voices generated in parallel (ElevenLabs' free tier allows 2 concurrent requests)
+TTS_CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "2"))
+
+# Attempts per ElevenLabs request when the API answers 429 Too Many Requests
+ELEVENLABS_MAX_RETRIES = 5
+
 # Update the default paths
 translations_file_path = '/Users/jiali/Documents/AdLocaliserV1/New clean ones 2025/translations/all_translations.txt'
 audio_output_directory = '/Users/jiali/Documents/AdLocaliserV1/New clean ones 2025/audio'
@@ -81,7 +97,74 @@ def sanitize_filename(text):
     """Remove special characters from filename"""
     return re.sub(r'[^\w\s-]', '', text).replace(' ', '_')
 
-def generate_elevenlabs_voice_direct(text, language_code, output_directory, voice_id, voice_name, english_identifier):
+class TTSCache:
+    """On-disk cache of generated voice files, keyed by a SHA-256 of the request"""
+
+    def __init__(self, output_directory, ttl=TTS_CACHE_TTL):
+        self.cache_dir = os.path.join(output_directory, "tts_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Shared by the generation worker threads, so serialize access with a lock
+        self.db = sqlite3.connect(os.path.join(self.cache_dir, "index.db"), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.db.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, path TEXT, ts INTEGER)")
+        self._evict_expired(ttl)
+
+    @staticmethod
+    def make_key(provider, request):
+        """Build the cache key from every parameter of one synthesis request"""
+        payload = json.dumps([provider, request], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _evict_expired(self, ttl):
+        """Remove cache entries (and their files) older than ttl seconds"""
+        cutoff = int(time.time()) - ttl
+        for (path,) in self.db.execute("SELECT path FROM cache WHERE ts < ?", (cutoff,)).fetchall():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.db.execute("DELETE FROM cache WHERE ts < ?", (cutoff,))
+        self.db.commit()
+
+    def get(self, key):
+        """Return the cached file path for key, or None on a miss"""
+        with self._lock:
+            row = self.db.execute("SELECT path FROM cache WHERE key = ?", (key,)).fetchone()
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def put(self, key, audio_content):
+        """Store audio bytes under key and return the cached file path"""
+        path = os.path.join(self.cache_dir, f"{key}.mp3")
+        with open(path, "wb") as f:
+            f.write(audio_content)
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO cache(key, path, ts) VALUES (?, ?, ?)",
+                            (key, path, int(time.time())))
+            self.db.commit()
+        return path
+
+    def close(self):
+        self.db.close()
+
+def get_retry_wait(response, attempt, max_delay=30):
+    """Seconds to wait before retrying a rate-limited request"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return random.uniform(0, min(max_delay, 2 ** attempt))
+
+def save_voice_file(audio_content, output_file, cache=None, cache_key=None):
+    """Write generated audio to output_file, storing it in the cache first when enabled"""
+    if cache is not None:
+        # copyfile rather than copy2: the output must get a fresh mtime so the audio mix step remixes it
+        shutil.copyfile(cache.put(cache_key, audio_content), output_file)
+    else:
+        with open(output_file, "wb") as f:
+            f.write(audio_content)
+
+def generate_elevenlabs_voice_direct(text, language_code, output_directory, voice_id, voice_name, english_identifier, cache=None):
     """Generate voice using ElevenLabs API with direct HTTP request"""
     try:
         # Create a clean voice name without spaces
@@ -93,15 +176,6 @@ def generate_elevenlabs_voice_direct(text, language_code, output_directory, voic
         # Create the final output filename
         output_file = f"{output_directory}/{safe_name}.mp3"
         
-        # Direct API call to ElevenLabs
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": API_KEY
-        }
-        
         data = {
             "text": text,
             "model_id": "eleven_multilingual_v2",
@@ -111,13 +185,36 @@ def generate_elevenlabs_voice_direct(text, language_code, output_directory, voic
             }
         }
         
+        # Reuse a previous generation of the exact same request
+        cache_key = TTSCache.make_key("elevenlabs", {"voice_id": voice_id, **data})
+        cached_file = cache.get(cache_key) if cache is not None else None
+        if cached_file:
+            shutil.copyfile(cached_file, output_file)
+            logging.info(f"Reused cached voice for {language_code} as {output_file}.")
+            return output_file
+        
+        # Direct API call to ElevenLabs
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+        
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": API_KEY
+        }
+        
         logging.info(f"Sending request to ElevenLabs API for {language_code}")
         
-        response = requests.post(url, json=data, headers=headers)
+        for attempt in range(ELEVENLABS_MAX_RETRIES):
+            response = requests.post(url, json=data, headers=headers)
+            if response.status_code != 429 or attempt == ELEVENLABS_MAX_RETRIES - 1:
+                break
+            # Too many concurrent requests for the plan - back off instead of failing
+            wait_time = get_retry_wait(response, attempt)
+            logging.warning(f"ElevenLabs rate limit hit for {language_code}, retrying in {wait_time:.1f} seconds...")
+            time.sleep(wait_time)
         
         if response.status_code == 200:
-            with open(output_file, "wb") as f:
-                f.write(response.content)
+            save_voice_file(response.content, output_file, cache, cache_key)
             
             logging.info(f"Generated and saved voice for {language_code} as {output_file}.")
             return output_file
@@ -128,12 +225,33 @@ def generate_elevenlabs_voice_direct(text, language_code, output_directory, voic
         logging.error(f"Error generating voice for {language_code}: {str(e)}")
         return None
 
-def generate_google_tts_voice(text, language_code, output_directory, english_identifier):
+def generate_google_tts_voice(text, language_code, output_directory, english_identifier, cache=None):
     """Generate voice using Google Text-to-Speech API"""
     try:
         # Create a safe filename based on the first few words of the text
         filename_base = extract_first_words(text, max_words=3, max_chars=20)
         
+        # Create a shorter output filename
+        output_file = f"{output_directory}/GoogleTTS_{language_code}_{english_identifier}_{filename_base}.mp3"
+        
+        # Check if the filename is still too long
+        if len(output_file) > 240:  # Safe limit for most filesystems
+            # Use an even shorter approach - just use the language code
+            output_file = f"{output_directory}/GoogleTTS_{language_code}_{english_identifier}_audio.mp3"
+        
+        # Reuse a previous generation of the exact same request (mirrors the parameters below)
+        cache_key = TTSCache.make_key("google", {
+            "text": text,
+            "language_code": language_code,
+            "ssml_gender": "NEUTRAL",
+            "audio_encoding": "MP3",
+        })
+        cached_file = cache.get(cache_key) if cache is not None else None
+        if cached_file:
+            shutil.copyfile(cached_file, output_file)
+            logging.info(f"Reused cached Google TTS voice for {language_code} as {output_file}.")
+            return output_file
+        
         # Initialize the TTS client
         client = texttospeech.TextToSpeechClient()
         
@@ -156,17 +274,8 @@ def generate_google_tts_voice(text, language_code, output_directory, english_ide
             input=synthesis_input, voice=voice, audio_config=audio_config
         )
         
-        # Create a shorter output filename
-        output_file = f"{output_directory}/GoogleTTS_{language_code}_{english_identifier}_{filename_base}.mp3"
-        
-        # Check if the filename is still too long
-        if len(output_file) > 240:  # Safe limit for most filesystems
-            # Use an even shorter approach - just use the language code
-            output_file = f"{output_directory}/GoogleTTS_{language_code}_{english_identifier}_audio.mp3"
-        
         # The response's audio_content is binary
-        with open(output_file, "wb") as out:
-            out.write(response.audio_content)
+        save_voice_file(response.audio_content, output_file, cache, cache_key)
             
         logging.info(f"Generated and saved Google TTS voice for {language_code} as {output_file}.")
         return output_file
@@ -204,37 +313,48 @@ def process_translations(input_file, output_directory):
         english_identifier = extract_first_words(english_text, max_words=2, max_chars=15)
         logging.info(f"Found {len(translations)} translations with identifier: {english_identifier}")
         
-        # Generate voices for each translation
-        for lang_code, text in translations.items():
-            try:
-                if lang_code in ["TH", "HK"]:
-                    # Use Google TTS for Thai and Cantonese
-                    google_lang_code = "th-TH" if lang_code == "TH" else "yue-HK"
-                    output_file = generate_google_tts_voice(
-                        text, 
-                        google_lang_code, 
-                        output_directory, 
-                        english_identifier
-                    )
-                else:
-                    # Use ElevenLabs for all other languages
-                    output_file = generate_elevenlabs_voice_direct(
-                        text, 
-                        lang_code, 
-                        output_directory, 
-                        voice_id, 
-                        voice_name, 
-                        english_identifier
-                    )
-                
-                if output_file:
-                    logging.info(f"Successfully generated voice for {lang_code}")
-                else:
-                    logging.error(f"Failed to generate voice for {lang_code}")
-                    
-            except Exception as e:
-                logging.error(f"Error processing {lang_code}: {str(e)}")
-                continue
+        def generate_voice(lang_code, text):
+            """Generate the voice for one translation with the appropriate provider"""
+            if lang_code in ["TH", "HK"]:
+                # Use Google TTS for Thai and Cantonese
+                google_lang_code = "th-TH" if lang_code == "TH" else "yue-HK"
+                return generate_google_tts_voice(
+                    text, 
+                    google_lang_code, 
+                    output_directory, 
+                    english_identifier,
+                    cache=cache
+                )
+            # Use ElevenLabs for all other languages
+            return generate_elevenlabs_voice_direct(
+                text, 
+                lang_code, 
+                output_directory, 
+                voice_id, 
+                voice_name, 
+                english_identifier,
+                cache=cache
+            )
+        
+        # Generate voices concurrently, reusing cached audio where possible
+        cache = TTSCache(output_directory)
+        try:
+            with ThreadPoolExecutor(max_workers=TTS_CONCURRENCY) as executor:
+                futures = {
+                    executor.submit(generate_voice, lang_code, text): lang_code
+                    for lang_code, text in translations.items()
+                }
+                for future in as_completed(futures):
+                    lang_code = futures[future]
+                    try:
+                        if future.result():
+                            logging.info(f"Successfully generated voice for {lang_code}")
+                        else:
+                            logging.error(f"Failed to generate voice for {lang_code}")
+                    except Exception as e:
+                        logging.error(f"Error processing {lang_code}: {str(e)}")
+        finally:
+            cache.close()
                 
         logging.info("Translation process completed.")
         return True
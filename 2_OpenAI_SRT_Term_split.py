@@ -1,24 +1,38 @@
 import os
 import json
+import hashlib
 from pathlib import Path
-from openai import OpenAI
 import shutil
 import re
+import asyncio
 
 # Maximum lengths dictionary for CJK languages - Move this to the top
 max_lengths = {'CN': 16, 'JP': 16, 'KR': 16, 'HK': 16}
 
+# Precompiled patterns used while building and splitting SRT entries
+_TRAILING_PUNCT = re.compile(r'[.,。!?！？]$')
+_SENT_RE = re.compile(r'[^.!?。！？]+[.!?。！？]?')
+
+# Terms kept whole when splitting CJK lines (earlier entries win on overlap)
+_PRESERVED_TERMS = ("Photoroom", "AI")
+
+# Tokenizer for CJK lines: preserved term, English word (up to the next space), space, any other character
+_CJK_TOKEN_RE = re.compile(
+    '(' + '|'.join(map(re.escape, _PRESERVED_TERMS)) + r')|([A-Za-z0-9][^ ]*)|( )|(.)',
+    re.DOTALL
+)
+_SPACE_TOKEN = 3
+
 def parse_timecode(timecode):
-    """Convert timecode string to milliseconds."""
-    hours, minutes, seconds, milliseconds = map(int, re.split('[:|,]', timecode))
-    return (hours * 3600 + minutes * 60 + seconds) * 1000 + milliseconds
+    """Convert a fixed-width HH:MM:SS,mmm timecode string to milliseconds."""
+    return (int(timecode[0:2]) * 3600000 + int(timecode[3:5]) * 60000
+            + int(timecode[6:8]) * 1000 + int(timecode[9:12]))
 
 def format_timecode(milliseconds):
     """Convert milliseconds to a timecode string."""
-    hours = milliseconds // 3600000
-    minutes = (milliseconds % 3600000) // 60000
-    seconds = (milliseconds % 60000) // 1000
-    milliseconds = milliseconds % 1000
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
     return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
 
 def split_lines(text, max_length, is_cjk):
@@ -27,46 +41,20 @@ def split_lines(text, max_length, is_cjk):
     current_line = ""
     
     if is_cjk:  # For CJK languages, split per character but preserve specific terms and English words
-        preserved_terms = ["Photoroom", "AI"]  # Add any other terms you want to preserve
-        i = 0
-        while i < len(text):
-            # Check for preserved terms
-            for term in preserved_terms:
-                if text[i:].startswith(term):
-                    if len(current_line) + len(term) <= max_length:
-                        current_line += term
-                        i += len(term)
-                    else:
-                        lines.append(current_line)
-                        current_line = term
-                        i += len(term)
-                    break
+        skip_space = False
+        for match in _CJK_TOKEN_RE.finditer(text):
+            kind = match.lastindex
+            token = match.group(kind)
+            # A single space after a term, word or character is only a separator
+            if kind == _SPACE_TOKEN and skip_space:
+                skip_space = False
+                continue
+            if len(current_line) + len(token) <= max_length:
+                current_line += token
             else:
-                # Check for English words (assuming they're space-separated)
-                if text[i].isascii() and text[i].isalnum():
-                    word_end = text.find(' ', i)
-                    if word_end == -1:
-                        word_end = len(text)
-                    word = text[i:word_end]
-                    if len(current_line) + len(word) <= max_length:
-                        current_line += word
-                        i = word_end
-                    else:
-                        lines.append(current_line)
-                        current_line = word
-                        i = word_end
-                else:
-                    # Handle CJK characters
-                    if len(current_line) + 1 <= max_length:
-                        current_line += text[i]
-                    else:
-                        lines.append(current_line)
-                        current_line = text[i]
-                    i += 1
-            
-            # Move to next character if it's a space
-            if i < len(text) and text[i] == ' ':
-                i += 1
+                lines.append(current_line)
+                current_line = token
+            skip_space = True
 
         if current_line:
             lines.append(current_line)
@@ -83,6 +71,19 @@ def split_lines(text, max_length, is_cjk):
 
     return lines
 
+def _iter_srt_blocks(file_path):
+    """Yield each SRT entry as a list of its non-empty lines, reading the file line by line."""
+    block = []
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                block.append(line.rstrip('\n'))
+            elif block:
+                yield block
+                block = []
+    if block:
+        yield block
+
 def process_srt(file_path, max_lengths):
     """Process an SRT file with language-specific line lengths respecting word boundaries for non-CJK languages."""
     language = 'EN'  # Default to English
@@ -102,21 +103,14 @@ def process_srt(file_path, max_lengths):
 
     max_length = max_lengths.get(language, 24)  # Get specific max length or default to 24
 
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-
-    entries = content.split('\n\n')
     new_entries = []
-    for entry in entries:
-        if entry.strip() == '':
-            continue
-        parts = entry.split('\n')
-        index = parts[0]
+    entry_number = 0
+    for parts in _iter_srt_blocks(file_path):
         times = parts[1]
         text = ' '.join(parts[2:])
         
         # Only remove punctuation at the end of the line
-        text = re.sub(r'[.,。!?！？]$', '', text.strip())
+        text = _TRAILING_PUNCT.sub('', text.strip())
         
         lines = split_lines(text, max_length, is_cjk)
         num_lines = len(lines)
@@ -125,15 +119,14 @@ def process_srt(file_path, max_lengths):
         end_ms = parse_timecode(end_time)
         increment = (end_ms - start_ms) // num_lines
 
-        new_entry = []
         for i, line in enumerate(lines):
             # Only remove punctuation at the end of the line
-            line = re.sub(r'[.,。!?！？]$', '', line.strip())
+            line = _TRAILING_PUNCT.sub('', line.strip())
             new_start_time = format_timecode(start_ms + i * increment)
             new_end_time = format_timecode(start_ms + (i + 1) * increment)
-            new_entry.append(f"{len(new_entries) + 1}\n{new_start_time} --> {new_end_time}\n{line}")
-            new_entries.append('\n'.join(new_entry))
-            new_entry = []
+            # Entries are renumbered sequentially since one input entry may become several
+            entry_number += 1
+            new_entries.append(f"{entry_number}\n{new_start_time} --> {new_end_time}\n{line}")
 
     # Save modified content to a new file with '_split' suffix
     new_file_path = file_path.replace('.srt', '_split.srt')
@@ -148,8 +141,19 @@ def process_srt(file_path, max_lengths):
     except Exception as e:
         print(f"Error removing original file {file_path}: {e}")
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# OpenAI client, created on first use so runs served from the transcript cache never import the SDK
+client = None
+
+def get_client():
+    """Return the shared AsyncOpenAI client, creating it on first use."""
+    global client
+    if client is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return client
+
+# Maximum number of Whisper uploads in flight at once
+MAX_CONCURRENT_TRANSCRIPTIONS = 5
 
 # Function to format time for SRT files
 def format_time(seconds):
@@ -180,99 +184,137 @@ def save_transcript_and_create_srt(transcript, base_path):
     with open(text_file_path, 'w') as text_file:
         json.dump(transcript, text_file, cls=JSONEncoder)
 
-    # Generate and save the SRT file
-    srt_content = ""
-    for i, segment in enumerate(transcript['segments']):
-        start_time = format_time(segment['start'])
-        end_time = format_time(segment['end'])
-        text = segment['text'].strip()
-        # Split long sentences at punctuation marks
-        sentences = re.split(r'([.!?。！？])', text)
-        # Remove empty strings and combine punctuation with sentences
-        sentences = [''.join(i) for i in zip(sentences[::2], sentences[1::2] + [''])]
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if len(sentences) > 1:
-            # Calculate time per sentence
-            duration = segment['end'] - segment['start']
-            time_per_sentence = duration / len(sentences)
-            
-            for j, sentence in enumerate(sentences):
-                sent_start = segment['start'] + (j * time_per_sentence)
-                sent_end = sent_start + time_per_sentence
-                # Only remove punctuation at the end of the line
-                sentence = re.sub(r'[.,。!?！？]$', '', sentence.strip())
-                srt_content += f"{i+j+1}\n{format_time(sent_start)} --> {format_time(sent_end)}\n{sentence}\n\n"
-        else:
-            # Only remove punctuation at the end of the line
-            text = re.sub(r'[.,。!?！？]$', '', text.strip())
-            srt_content += f"{i+1}\n{start_time} --> {end_time}\n{text}\n\n"
-    
-    # Create SRT folder if it doesn't exist and save the file
+    # Create SRT folder if it doesn't exist and stream the SRT entries straight to the file
     srt_file_path.parent.mkdir(parents=True, exist_ok=True)
     with open(srt_file_path, 'w', encoding='utf-8') as srt_file:
-        srt_file.write(srt_content)
+        for i, segment in enumerate(transcript['segments']):
+            start_time = format_time(segment['start'])
+            end_time = format_time(segment['end'])
+            text = segment['text'].strip()
+            # Split long sentences at punctuation marks, keeping each sentence's punctuation
+            sentences = [s.strip() for s in _SENT_RE.findall(text) if s.strip()]
+            
+            if len(sentences) > 1:
+                # Calculate time per sentence
+                duration = segment['end'] - segment['start']
+                time_per_sentence = duration / len(sentences)
+                
+                for j, sentence in enumerate(sentences):
+                    sent_start = segment['start'] + (j * time_per_sentence)
+                    sent_end = sent_start + time_per_sentence
+                    # Only remove punctuation at the end of the line
+                    sentence = _TRAILING_PUNCT.sub('', sentence.strip())
+                    srt_file.write(f"{i+j+1}\n{format_time(sent_start)} --> {format_time(sent_end)}\n{sentence}\n\n")
+            else:
+                # Only remove punctuation at the end of the line
+                text = _TRAILING_PUNCT.sub('', text.strip())
+                srt_file.write(f"{i+1}\n{start_time} --> {end_time}\n{text}\n\n")
 
     return srt_file_path
 
-background_terms = (
-    "AI Backgrounds, "
-    "Photoroom, "  # Added a space after Photoroom
-    "خلفيات الذكاء الاصطناعي, "  # Arabic
-    "AI 背景, "                 # Chinese Simplified
-    "AI 背景, "                 # Chinese Traditional (unchanged)
-    "AI-baggrunde, "           # Danish
-    "AI-Achtergronden, "       # Dutch
-    "AI-taustat, "             # Finnish
-    "Fonds IA, "               # French
-    "AI Backgrounds, "         # German
-    "Φόντα ΤΝ, "               # Greek
-    "רקעים ב-AI, "             # Hebrew
-    "AI hátterek, "            # Hungarian
-    "Latar Belakang AI, "      # Indonesian
-    "Sfondi IA, "              # Italian
-    "AI 背景生成, "             # Japanese
-    "AI 배경, "                 # Korean
-    "Latar Belakang AI, "      # Malay
-    "KI-bakgrunner, "          # Norwegian
-    "AI Backgrounds, "         # Persian
-    "AI Backgrounds, "         # Polish
-    "Fundos IA, "              # Portuguese (Brazil)
-    "Fundos IA, "              # Portuguese (Portugal)
-    "Fundaluri IA, "           # Romanian
-    "ИИ-фоны, "                # Russian
-    "Fondos IA, "              # Spanish
-    "AI-bakgrunder, "          # Swedish
-    "พื้นหลัง AI, "            # Thai
-    "YZ Arka Planlar, "        # Turkish
-    "ШІ-фони, "                # Ukrainian
-    "Hình nền AI"              # Vietnamese
-    "AI 背景 (繁體中文)"         # Explicitly mentioning Traditional Chinese
+# Vocabulary hints passed to Whisper as the transcription prompt
+_BACKGROUND_TERMS = (
+    "AI Backgrounds",
+    "Photoroom",
+    "خلفيات الذكاء الاصطناعي",  # Arabic
+    "AI 背景",                   # Chinese Simplified
+    "AI 背景",                   # Chinese Traditional (unchanged)
+    "AI-baggrunde",            # Danish
+    "AI-Achtergronden",        # Dutch
+    "AI-taustat",              # Finnish
+    "Fonds IA",                # French
+    "AI Backgrounds",          # German
+    "Φόντα ΤΝ",                # Greek
+    "רקעים ב-AI",              # Hebrew
+    "AI hátterek",             # Hungarian
+    "Latar Belakang AI",       # Indonesian
+    "Sfondi IA",               # Italian
+    "AI 背景生成",                 # Japanese
+    "AI 배경",                   # Korean
+    "Latar Belakang AI",       # Malay
+    "KI-bakgrunner",           # Norwegian
+    "AI Backgrounds",          # Persian
+    "AI Backgrounds",          # Polish
+    "Fundos IA",               # Portuguese (Brazil)
+    "Fundos IA",               # Portuguese (Portugal)
+    "Fundaluri IA",            # Romanian
+    "ИИ-фоны",                 # Russian
+    "Fondos IA",               # Spanish
+    "AI-bakgrunder",           # Swedish
+    "พื้นหลัง AI",             # Thai
+    "YZ Arka Planlar",         # Turkish
+    "ШІ-фони",                 # Ukrainian
+    "Hình nền AI",             # Vietnamese
+    "AI 背景 (繁體中文)",            # Explicitly mentioning Traditional Chinese
 )
+background_terms = ", ".join(_BACKGROUND_TERMS)
 
 
-def transcribe_with_prompt(audio_file_path):
-    specific_terms = f"{background_terms}"  # Merge with previously defined AI Backgrounds terms
+# Whisper results are cached here, keyed by audio content and prompt
+transcript_cache_directory = Path("/Users/jiali/Documents/AdLocaliserV1/New clean ones 2025/transcript_cache")
+
+def get_transcript_cache_key(audio_file_path):
+    """Build a cache key from the audio file's contents and the Whisper prompt."""
+    file_hash = hashlib.sha256()
     with open(audio_file_path, "rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
-            file=audio_file,
-            model="whisper-1",
-            response_format="verbose_json",
-            prompt=specific_terms
-        )
+        for chunk in iter(lambda: audio_file.read(1 << 20), b''):
+            file_hash.update(chunk)
+    prompt_hash = hashlib.md5(background_terms.encode('utf-8')).hexdigest()[:8]
+    return f"{file_hash.hexdigest()}_{prompt_hash}"
+
+async def transcribe_with_prompt(audio_file_path, semaphore):
+    specific_terms = f"{background_terms}"  # Merge with previously defined AI Backgrounds terms
+
+    # Reuse a previous transcription of the same audio if we have one
+    cache_key = await asyncio.to_thread(get_transcript_cache_key, audio_file_path)
+    cache_path = transcript_cache_directory / f"{cache_key}.json"
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable transcript cache {cache_path}: {e}")
+
+    async with semaphore:
+        with open(audio_file_path, "rb") as audio_file:
+            transcription = await get_client().audio.transcriptions.create(
+                file=audio_file,
+                model="whisper-1",
+                response_format="verbose_json",
+                prompt=specific_terms
+            )
     # Ensure the transcription object is in a serializable format
     if hasattr(transcription, 'model_dump'):
-        return transcription.model_dump()
-    else:
-        return transcription  # Handle non-serializable case as fallback
+        transcription = transcription.model_dump()
+
+    try:
+        transcript_cache_directory.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(transcription, cache_file, cls=JSONEncoder)
+    except OSError as e:
+        print(f"Error caching transcript for {audio_file_path}: {e}")
+
+    return transcription  # Non-serializable objects are passed through as a fallback
+
+async def transcribe_all(audio_file_paths):
+    """Transcribe audio files concurrently; results (or exceptions) come back in input order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+    return await asyncio.gather(
+        *(transcribe_with_prompt(path, semaphore) for path in audio_file_paths),
+        return_exceptions=True
+    )
 
 # Directory containing your audio files
 audio_files_directory = "/Users/jiali/Documents/AdLocaliserV1/New clean ones 2025/audio"
 
-# Iterate through audio files in the directory
-for audio_file_path in Path(audio_files_directory).glob('*.mp3'):
-    # Transcribe with Whisper considering specific terms
-    transcript = transcribe_with_prompt(audio_file_path)
+# Transcribe all audio files with Whisper considering specific terms
+audio_file_paths = list(Path(audio_files_directory).glob('*.mp3'))
+transcripts = asyncio.run(transcribe_all(audio_file_paths))
+
+for audio_file_path, transcript in zip(audio_file_paths, transcripts):
+    if isinstance(transcript, Exception):
+        print(f"Error transcribing {audio_file_path}: {transcript}")
+        continue
 
     # Save transcript as JSON and create SRT file
     srt_file_path = save_transcript_and_create_srt(transcript, audio_file_path)
@@ -3,13 +3,17 @@ import subprocess
 import os
 import sys
 import argparse
-import shutil
 import unicodedata
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Parse command line arguments
 parser = argparse.ArgumentParser(description="Mix audio with video")
 parser.add_argument("--volume-settings", help="Path to volume settings file")
+parser.add_argument("--single-pass", action="store_true",
+                    help="Mix all languages in one FFmpeg run instead of one run per audio file")
+parser.add_argument("--force", action="store_true",
+                    help="Remix every language even if an up-to-date export already exists")
 args = parser.parse_args()
 
 # Get volume settings from file or use defaults
@@ -55,33 +59,68 @@ if not video_files:
 
 # Using the first found video file
 video_file = video_files[0]
+video_stat = video_file.stat()
 print(f"Using video file: {video_file}")
 
+# The video is the same for every mix, so check its audio stream once up front
+probe_cmd = [
+    "ffprobe",
+    "-v", "error",
+    "-select_streams", "a:0",
+    "-show_entries", "stream=codec_name",
+    "-of", "default=noprint_wrappers=1:nokey=1",
+    str(video_file)
+]
+result = subprocess.run(probe_cmd, capture_output=True, text=True)
+if result.returncode != 0:
+    print(f"Error probing video file: {result.stderr}")
+    sys.exit(1)
+video_audio_codec = result.stdout.strip()
+if not video_audio_codec:
+    print(f"No audio stream found in video file: {video_file}")
+    sys.exit(1)
+print(f"Video audio codec: {video_audio_codec}")
+
+# Each mix runs in its own ffmpeg process, so threads are enough to keep several going at once;
+# half the cores leaves headroom for ffmpeg's own threads
+max_workers = max(1, (os.cpu_count() or 2) // 2)
+
+# Voice name prefixes produced by the voice generation step
+SUPPORTED_VOICES = frozenset({'TomCruise', 'DojaCat', 'KIM', 'Chris'})
+
 def extract_language_code(filename):
     """Extract language code from filename for all voice types"""
-    parts = filename.stem.split('_')
+    # Only the voice name and language code are needed
+    parts = filename.stem.split('_', 2)
     
     # Check if the filename starts with any of the supported voice types
-    supported_voices = ['TomCruise', 'DojaCat', 'KIM', 'Chris']
-    if len(parts) >= 2 and parts[0] in supported_voices:
+    if len(parts) >= 2 and parts[0] in SUPPORTED_VOICES:
         # The language code is always the second part
         return parts[1]
     
     return 'unknown'
 
+# Spaces, apostrophes and the common accented Latin letters, handled without unicodedata
+_ACCENT_MAP = str.maketrans({
+    ' ': '_', "'": None,
+    **dict(zip("àáâãäåèéêëìíîïòóôõöùúûüýÿñç", "aaaaaaeeeeiiiiooooouuuuyync")),
+    **dict(zip("ÀÁÂÃÄÅÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜÝÑÇ", "AAAAAAEEEEIIIIOOOOOUUUUYNC")),
+})
+_UNSAFE_FN_RE = re.compile(r'[^a-zA-Z0-9._-]')
+
 def sanitize_filename(filename):
     """Create a safe version of the filename"""
     name = os.path.basename(filename)
-    name = name.replace(' ', '_')
-    name = name.replace("'", "")
-    name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode()
-    name = re.sub(r'[^a-zA-Z0-9._-]', '_', name)
-    return name
-
-def validate_audio_file(file_path):
-    """Validate if the audio file is properly formatted"""
+    name = name.translate(_ACCENT_MAP)
+    # Only fall back to Unicode decomposition for characters the table doesn't cover
+    if not name.isascii():
+        name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode()
+    return _UNSAFE_FN_RE.sub('_', name)
+
+def validate_audio_file(file_path, file_size):
+    """Validate if the audio file is properly formatted, using the size from the caller's stat"""
     try:
-        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        if file_size == 0:
             return False, "File is empty or doesn't exist"
 
         probe_cmd = [
@@ -105,29 +144,52 @@ def validate_audio_file(file_path):
     except Exception as e:
         return False, f"Validation error: {str(e)}"
 
-def process_audio_file(audio_file, video_file, export_dir, original_volume, voiceover_volume):
-    """Process a single audio file with error handling"""
-    temp_audio = None
+def get_output_path(video_file, language_code, export_dir):
+    """Build the export path for a language, keeping the filename safe for later tools"""
+    return export_dir / sanitize_filename(f"{video_file.stem}_{language_code}.mp4")
+
+def get_mix_comment(original_volume, voiceover_volume):
+    """Describe the mix settings; stored in each output's comment tag so changed volumes trigger a remix"""
+    return f"AdLocalizer mix: original={original_volume} voiceover={voiceover_volume}"
+
+def read_mix_comment(output_file_path):
+    """Read back the comment tag written by get_mix_comment, or '' if there is none"""
+    probe_cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format_tags=comment",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(output_file_path)
+    ]
+    result = subprocess.run(probe_cmd, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+def is_output_up_to_date(output_file_path, audio_stat, video_stat, mix_comment):
+    """Check whether a complete output exists that is newer than both of its sources and used the same volumes"""
+    if args.force:
+        return False
+    try:
+        output_stat = output_file_path.stat()
+    except FileNotFoundError:
+        return False
+    if output_stat.st_size < 1000000:  # Less than 1MB means an earlier run failed
+        return False
+    if output_stat.st_mtime < max(audio_stat.st_mtime, video_stat.st_mtime):
+        return False
+    # Only probe outputs that would otherwise be skipped
+    previous_comment = read_mix_comment(output_file_path)
+    if previous_comment != mix_comment:
+        print(f"Remixing {output_file_path.name}: volume settings changed ({previous_comment or 'unknown settings'})")
+        return False
+    return True
+
+def process_audio_file(audio_file, audio_stat, video_file, video_stat, export_dir, original_volume, voiceover_volume):
+    """Process a single audio file with error handling, reusing the caller's stat results"""
+    mix_comment = get_mix_comment(original_volume, voiceover_volume)
     try:
-        # Create a temporary copy of the audio file with a safe name
-        temp_dir = Path('/tmp/audio_processing')
-        temp_dir.mkdir(exist_ok=True)
-        
         print(f"\nProcessing file: {audio_file}")
-        print(f"Original file size: {os.path.getsize(audio_file)} bytes")
-        print(f"Video file size: {os.path.getsize(video_file)} bytes")
-        
-        safe_name = sanitize_filename(audio_file.name)
-        temp_audio = temp_dir / safe_name
-        shutil.copy2(audio_file, temp_audio)
-        
-        # Validate the audio file before processing
-        is_valid, message = validate_audio_file(temp_audio)
-        print(f"Validation result: {message}")
-        
-        if not is_valid:
-            print(f"Invalid audio file {audio_file.name}: {message}")
-            return False
+        print(f"Original file size: {audio_stat.st_size} bytes")
+        print(f"Video file size: {video_stat.st_size} bytes")
         
         # Extract language code from original filename
         language_code = extract_language_code(audio_file)
@@ -136,39 +198,36 @@ def process_audio_file(audio_file, video_file, export_dir, original_volume, voic
             return False
             
         # Create output filename using video name and language code
-        output_file_path = export_dir / f"{video_file.stem}_{language_code}.mp4"
+        output_file_path = get_output_path(video_file, language_code, export_dir)
         
-        print(f"Processing: {audio_file.name} -> {output_file_path}")
-        print(f"Using volume settings: original={original_volume}, voiceover={voiceover_volume}")
-
-        # First, check if we can read the video's audio stream
-        probe_cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a:0",
-            "-show_entries", "stream=codec_name",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_file)
-        ]
+        # Nothing to do if a previous run already mixed this language
+        if is_output_up_to_date(output_file_path, audio_stat, video_stat, mix_comment):
+            print(f"Skipping already mixed output ({mix_comment}): {output_file_path}")
+            return True
         
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"Error probing video file: {result.stderr}")
+        # Validate the audio file before processing
+        is_valid, message = validate_audio_file(audio_file, audio_stat.st_size)
+        print(f"Validation result: {message}")
+        
+        if not is_valid:
+            print(f"Invalid audio file {audio_file.name}: {message}")
             return False
-            
-        print(f"Video audio codec: {result.stdout.strip()}")
+        
+        print(f"Processing: {audio_file.name} -> {output_file_path}")
+        print(f"Using volume settings: original={original_volume}, voiceover={voiceover_volume}")
 
         # Simplified FFmpeg command for mixing audio
         ffmpeg_command = [
             "ffmpeg",
             "-y",
             "-i", str(video_file),
-            "-i", str(temp_audio),
+            "-i", str(audio_file),
             "-filter_complex",
             f"[0:a]volume={original_volume}[a1];[1:a]volume={voiceover_volume}[a2];[a1][a2]amix=inputs=2:duration=first",
             "-c:v", "copy",
             "-c:a", "aac",
             "-strict", "experimental",
+            "-metadata", f"comment={mix_comment}",
             str(output_file_path)
         ]
 
@@ -192,7 +251,7 @@ def process_audio_file(audio_file, video_file, export_dir, original_volume, voic
                 output_file_path.unlink()
             return False
         
-        # Verify the output file
+        # FFmpeg's exit code plus a size check is enough to trust the output
         if not output_file_path.exists():
             print(f"Output file was not created: {output_file_path}")
             return False
@@ -203,21 +262,6 @@ def process_audio_file(audio_file, video_file, export_dir, original_volume, voic
             output_file_path.unlink()
             return False
             
-        # Verify the output file has both video and audio streams
-        probe_cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "stream=codec_type",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(output_file_path)
-        ]
-        
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        if result.returncode != 0 or 'video' not in result.stdout or 'audio' not in result.stdout:
-            print(f"Output file is missing video or audio streams: {result.stdout}")
-            output_file_path.unlink()
-            return False
-            
         print(f"Successfully generated: {output_file_path} ({output_size} bytes)")
         return True
             
@@ -226,49 +270,137 @@ def process_audio_file(audio_file, video_file, export_dir, original_volume, voic
         import traceback
         traceback.print_exc()
         return False
-    finally:
-        # Clean up temporary files
-        if temp_audio and temp_audio.exists():
-            try:
-                temp_audio.unlink()
-                print(f"Cleaned up temporary file: {temp_audio}")
-            except Exception as e:
-                print(f"Error cleaning up temporary file: {e}")
 
-# Debug info
+def drop_duplicate_outputs(audio_entries, video_file, export_dir):
+    """Keep only the first audio file for each output path so parallel jobs never write the same file"""
+    kept = []
+    claimed = set()
+    for audio_file, audio_stat in audio_entries:
+        language_code = extract_language_code(audio_file)
+        if language_code != 'unknown':
+            output_file_path = get_output_path(video_file, language_code, export_dir)
+            if output_file_path in claimed:
+                print(f"Skipping {audio_file.name}: another file already produces {output_file_path.name}")
+                continue
+            claimed.add(output_file_path)
+        kept.append((audio_file, audio_stat))
+    return kept
+
+def mix_all_in_one_pass(audio_entries, video_file, video_stat, export_dir, original_volume, voiceover_volume):
+    """Mix every audio file with the video in a single FFmpeg run, returning the number of good outputs"""
+    mix_comment = get_mix_comment(original_volume, voiceover_volume)
+    jobs = []
+    skipped_count = 0
+    for audio_file, audio_stat in audio_entries:
+        language_code = extract_language_code(audio_file)
+        if language_code == 'unknown':
+            print(f"Skipping file with unknown format: {audio_file.name}")
+            continue
+        output_file_path = get_output_path(video_file, language_code, export_dir)
+        if is_output_up_to_date(output_file_path, audio_stat, video_stat, mix_comment):
+            print(f"Skipping already mixed output ({mix_comment}): {output_file_path}")
+            skipped_count += 1
+            continue
+        is_valid, message = validate_audio_file(audio_file, audio_stat.st_size)
+        if not is_valid:
+            print(f"Invalid audio file {audio_file.name}: {message}")
+            continue
+        jobs.append((audio_file, output_file_path))
+
+    if not jobs:
+        return skipped_count
+
+    # Decode the video's audio once and split it into one branch per language
+    filters = [f"[0:a]volume={original_volume},asplit={len(jobs)}" + "".join(f"[orig{i}]" for i in range(len(jobs)))]
+    for i in range(len(jobs)):
+        filters.append(f"[{i + 1}:a]volume={voiceover_volume}[voice{i}]")
+        filters.append(f"[orig{i}][voice{i}]amix=inputs=2:duration=first[out{i}]")
+
+    ffmpeg_command = ["ffmpeg", "-y", "-i", str(video_file)]
+    for audio_file, _ in jobs:
+        ffmpeg_command += ["-i", str(audio_file)]
+    ffmpeg_command += ["-filter_complex", ";".join(filters)]
+    for i, (_, output_file_path) in enumerate(jobs):
+        ffmpeg_command += [
+            "-map", "0:v",
+            "-map", f"[out{i}]",
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-strict", "experimental",
+            "-metadata", f"comment={mix_comment}",
+            str(output_file_path)
+        ]
+
+    print(f"Mixing {len(jobs)} languages in a single FFmpeg run")
+    print(" ".join(str(x) for x in ffmpeg_command))
+    result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        print("Error in single-pass FFmpeg run:")
+        print(f"STDERR: {result.stderr}")
+        for _, output_file_path in jobs:
+            if output_file_path.exists():
+                output_file_path.unlink()
+        return skipped_count
+
+    success_count = skipped_count
+    for _, output_file_path in jobs:
+        if not output_file_path.exists():
+            print(f"Output file was not created: {output_file_path}")
+            continue
+        output_size = output_file_path.stat().st_size
+        if output_size < 1000000:  # Less than 1MB
+            print(f"Output file is too small ({output_size} bytes)")
+            output_file_path.unlink()
+            continue
+        print(f"Successfully generated: {output_file_path} ({output_size} bytes)")
+        success_count += 1
+    return success_count
+
+# List the audio files once; DirEntry.stat() results are reused for the rest of the run
 print(f"Looking for audio files in: {audio_dir}")
-audio_files = list(audio_dir.glob('*.mp3'))
-print(f"Found {len(audio_files)} MP3 files")
-for file in audio_files:
-    print(f"File: {file.name}, Size: {file.stat().st_size} bytes")
+with os.scandir(audio_dir) as entries:
+    audio_entries = [
+        (Path(entry.path), entry.stat())
+        for entry in entries
+        if entry.name.endswith('.mp3') and entry.is_file()
+    ]
+print(f"Found {len(audio_entries)} MP3 files")
+for audio_file, audio_stat in audio_entries:
+    print(f"File: {audio_file.name}, Size: {audio_stat.st_size} bytes")
 
 # Main processing loop
 print("Starting to process audio files...")
 processed_count = 0
 success_count = 0
-audio_files = list(audio_dir.glob('*.mp3'))
-total_files = len(audio_files)
+total_files = len(audio_entries)
 
-print(f"Found {total_files} MP3 files to process")
-for audio_file in audio_files:
-    try:
-        print(f"\nProcessing file {processed_count + 1} of {total_files}")
-        if process_audio_file(audio_file, video_file, export_dir, original_volume, voiceover_volume):
-            success_count += 1
-        processed_count += 1
-        print(f"Progress: {processed_count}/{total_files} files processed, {success_count} successful")
-    except Exception as e:
-        print(f"Error in main loop processing {audio_file.name}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+# Voices or scripts sharing a language map to the same output, so only one may produce it
+unique_entries = drop_duplicate_outputs(audio_entries, video_file, export_dir)
 
-# Clean up temporary directory
-temp_dir = Path('/tmp/audio_processing')
-if temp_dir.exists():
-    try:
-        shutil.rmtree(temp_dir)
-        print(f"Cleaned up temporary directory: {temp_dir}")
-    except Exception as e:
-        print(f"Error cleaning up temporary directory: {e}")
+if args.single_pass:
+    print(f"Found {total_files} MP3 files to process in a single pass")
+    success_count = mix_all_in_one_pass(unique_entries, video_file, video_stat, export_dir, original_volume, voiceover_volume)
+else:
+    print(f"Found {total_files} MP3 files to process with {max_workers} parallel jobs")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                process_audio_file, audio_file, audio_stat, video_file, video_stat,
+                export_dir, original_volume, voiceover_volume
+            ): audio_file
+            for audio_file, audio_stat in unique_entries
+        }
+        for future in as_completed(futures):
+            audio_file = futures[future]
+            try:
+                if future.result():
+                    success_count += 1
+            except Exception as e:
+                print(f"Error in main loop processing {audio_file.name}: {str(e)}")
+                import traceback
+                traceback.print_exc()
+            processed_count += 1
+            print(f"Progress: {processed_count}/{total_files} files processed, {success_count} successful")
 
 print(f"Batch processing complete. Successfully processed {success_count} out of {total_files} files.")
\ No newline at end of file
@@ -1,10 +1,19 @@
 import logging
-from moviepy.editor import VideoFileClip, CompositeVideoClip, TextClip, ImageClip
-from moviepy.video.tools.subtitles import SubtitlesClip
-from PIL import Image, ImageDraw, ImageFont
+import functools
+import bisect
 import numpy as np
 import glob
+import re
+import json
+import os
+import subprocess
+import argparse
+import tempfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# MoviePy and PIL are imported inside the functions that need them: MoviePy alone takes
+# about a second to import, which every spawned worker would otherwise pay up front.
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,82 +41,299 @@ def select_font(language_code):
 # Update languages_to_skip to only exclude 'IN' (Hindi)
 languages_to_skip = ['IN']
 
+# Scripts that need special sizing when rendering subtitles
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+_THAI_RE = re.compile(r'[\u0E00-\u0E7F]')
+
+# Rough peak memory of one MoviePy render, used to cap the number of parallel workers
+memory_per_worker = 2 * 1024 ** 3
+
+def get_worker_count(job_count):
+    """Run as many renders in parallel as cores and physical memory allow."""
+    workers = min(job_count, os.cpu_count() or 1)
+    try:
+        total_memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        workers = min(workers, total_memory // memory_per_worker)
+    except (AttributeError, ValueError, OSError):
+        pass  # sysconf isn't available everywhere; fall back to the CPU count
+    return max(1, workers)
+
+# H.264 encoders in order of preference, with the write_videofile settings for each.
+# libx264 is the software fallback and always comes last.
+video_encoders = [
+    ('h264_nvenc', {'preset': 'fast', 'ffmpeg_params': ['-cq', '23', '-pix_fmt', 'yuv420p']}),
+    ('h264_qsv', {'preset': 'veryfast', 'ffmpeg_params': ['-global_quality', '23', '-pix_fmt', 'nv12']}),
+    ('h264_videotoolbox', {'preset': 'veryfast', 'ffmpeg_params': ['-b:v', '6M', '-allow_sw', '1', '-pix_fmt', 'yuv420p']}),
+    ('libx264', {'preset': 'veryfast', 'ffmpeg_params': ['-crf', '23', '-pix_fmt', 'yuv420p']}),
+]
+
+def get_video_encoder(ffmpeg_binary):
+    """Pick the fastest H.264 encoder that actually works with the given ffmpeg on this machine."""
+    for codec, settings in video_encoders[:-1]:
+        # Being listed by `ffmpeg -encoders` doesn't mean the hardware is there, so try a tiny encode
+        test_command = [
+            ffmpeg_binary, '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+            '-frames:v', '1', '-c:v', codec, '-preset', settings['preset'],
+            *settings['ffmpeg_params'], '-f', 'null', '-'
+        ]
+        try:
+            result = subprocess.run(test_command, capture_output=True, timeout=20)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            logging.info(f"Using hardware encoder {codec}")
+            return codec, settings
+    return video_encoders[-1]
+
+def write_video(clip, output_video_file, threads, encoder):
+    """Encode a clip with the given (codec, settings) encoder, falling back to libx264 if it fails."""
+    codec, settings = encoder
+    try:
+        clip.write_videofile(
+            output_video_file,
+            codec=codec,
+            audio_codec='aac',
+            threads=threads,
+            logger=None,  # The progress bar only slows parallel renders down
+            **settings
+        )
+    except Exception as e:
+        fallback_codec, fallback_settings = video_encoders[-1]
+        if codec == fallback_codec:
+            raise
+        # Hardware encoders limit concurrent sessions, so a parallel render can still be refused
+        logging.warning(f"{codec} failed for {output_video_file} ({e}), retrying with {fallback_codec}")
+        clip.write_videofile(
+            output_video_file,
+            codec=fallback_codec,
+            audio_codec='aac',
+            threads=threads,
+            logger=None,
+            **fallback_settings
+        )
+
+@functools.lru_cache(maxsize=32)
 def create_rounded_rectangle(size, radius, color):
-    """Creates an image with a rounded rectangle."""
-    mask = Image.new('L', size, 0)
-    draw = ImageDraw.Draw(mask)
-    draw.rounded_rectangle([(0, 0), size], radius, fill=255)
-    rounded_rect = Image.new('RGB', size, color)
-    rounded_rect.putalpha(mask)
-    return np.array(rounded_rect)
-
-def create_text_clip_with_background(txt, fontsize, font_name, text_color):
-    """Creates a text clip with a white rounded background."""
-    # Special handling only for Arabic text
-    if any('\u0600' <= char <= '\u06FF' for char in txt):
-        fontsize = int(fontsize * 1.2)
-        # Create PIL Image for Arabic text
-        font = ImageFont.truetype(font_name, fontsize)
-        temp_img = Image.new('RGBA', (1000, 200), (255, 255, 255, 0))
-        temp_draw = ImageDraw.Draw(temp_img)
-        bbox = temp_draw.textbbox((0, 0), txt, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        h_padding = 70
-        v_padding = 30
-        img_width = text_width + h_padding
-        img_height = text_height + v_padding
-        
-        # Create background with rounded corners
-        bg = Image.new('RGBA', (img_width, img_height), (255, 255, 255, 0))
-        bg_draw = ImageDraw.Draw(bg)
-        bg_draw.rounded_rectangle([(0, 0), (img_width, img_height)], 15, fill=(255, 255, 255, 255))
-        
-        # Draw Arabic text from right to left
-        bg_draw.text((img_width - text_width - h_padding//2, v_padding//2), 
-                     txt, 
-                     font=font, 
-                     fill='black',
-                     direction='rtl')
-        
-        return ImageClip(np.array(bg)).set_duration(1)
-        
-    else:
-        # Original code for all other languages
-        if any('\u0E00' <= char <= '\u0E7F' for char in txt):  # Thai
-            fontsize = int(fontsize * 1.3)
-        
-        fontsize = max(40, min(fontsize, 80))
-        
-        text_clip = TextClip(
-            txt, 
-            fontsize=fontsize, 
-            font=font_name, 
-            color=text_color,
-            kerning=-1,
-            method='label'
+    """Creates an image with a rounded rectangle; size and color must be tuples so results can be cached."""
+    width, height = size
+    # Pixel centres, compared against the nearest point of the rectangle the corner arcs are centred on.
+    # The box spans (0, 0)-(width, height) inclusive, like PIL's rounded_rectangle([(0, 0), size]).
+    ys, xs = np.ogrid[:height, :width]
+    px, py = xs + 0.5, ys + 0.5
+    nearest_x = np.clip(px, radius, width + 1 - radius)
+    nearest_y = np.clip(py, radius, height + 1 - radius)
+    inside = (px - nearest_x) ** 2 + (py - nearest_y) ** 2 <= radius * radius
+
+    rounded_rect = np.empty((height, width, 4), dtype=np.uint8)
+    rounded_rect[..., :3] = color
+    rounded_rect[..., 3] = np.where(inside, 255, 0)
+    rounded_rect.setflags(write=False)  # Shared between clips, so keep it read-only
+    return rounded_rect
+
+@functools.lru_cache(maxsize=16)
+def _load_font(font_path, fontsize):
+    """Load a font once per path and size instead of re-parsing the file for every line."""
+    from PIL import ImageFont
+    return ImageFont.truetype(font_path, fontsize)
+
+def _render_with_pil(txt, fontsize, font_name, text_color, h_padding, direction=None):
+    """Draw a subtitle line on a white rounded background with PIL, returning an RGBA array."""
+    from PIL import Image, ImageDraw
+    font = _load_font(font_name, fontsize)
+    left, top, right, bottom = font.getbbox(txt, direction=direction)
+    text_width = right - left
+    text_height = bottom - top
+
+    v_padding = 30
+    size = (text_width + h_padding, text_height + v_padding)
+    bg = Image.fromarray(create_rounded_rectangle(size, radius=15, color=(255, 255, 255))).copy()
+
+    # Offset by the bbox origin so the text itself is centred in the padding
+    bg_draw = ImageDraw.Draw(bg)
+    bg_draw.text((h_padding // 2 - left, v_padding // 2 - top),
+                 txt,
+                 font=font,
+                 fill=text_color,
+                 direction=direction)
+
+    image = np.array(bg)
+    image.setflags(write=False)  # Cached and shared, so keep it read-only
+    return image
+
+# Ads repeat lines a lot, so identical subtitles share one rendered image
+@functools.lru_cache(maxsize=512)
+def create_subtitle_image(txt, fontsize, font_name, text_color):
+    """Creates an RGBA image of the text on a white rounded background."""
+    # Arabic gets a larger font and is drawn from right to left
+    if _ARABIC_RE.search(txt):
+        return _render_with_pil(txt, int(fontsize * 1.2), font_name, text_color, h_padding=70, direction='rtl')
+
+    is_thai = _THAI_RE.search(txt) is not None
+    if is_thai:
+        fontsize = int(fontsize * 1.3)
+    fontsize = max(40, min(fontsize, 80))
+
+    return _render_with_pil(txt, fontsize, font_name, text_color, h_padding=60 if is_thai else 50)
+
+# libass lays out SRT subtitles on a 384x288 canvas, so sizes are converted to that scale
+ass_play_res_y = 288
+
+def _escape_filter_value(value):
+    """Escape a value for an ffmpeg filter option, then again for the surrounding filtergraph."""
+    for char in "\\':":
+        value = value.replace(char, '\\' + char)
+    for char in "\\'[],;":
+        value = value.replace(char, '\\' + char)
+    return value
+
+def _format_srt_time(seconds):
+    """Convert seconds to an SRT timecode."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02},{milliseconds:03}"
+
+_SRT_TIME_RE = re.compile(r'(\d+):(\d+):(\d+)[,.](\d+)')
+
+def read_srt(srt_file):
+    """Parse an SRT file into ((start, end), text) pairs, like MoviePy's file_to_subtitles without importing it."""
+    subtitles = []
+    times, lines = None, []
+    with open(srt_file, encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            stamps = _SRT_TIME_RE.findall(line) if '-->' in line else []
+            if len(stamps) == 2:
+                times = tuple(int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000 for h, m, s, ms in stamps)
+                lines = []
+            elif not line.strip():
+                if times is not None and lines:
+                    subtitles.append((times, "\n".join(lines)))
+                times, lines = None, []
+            elif times is not None:
+                lines.append(line)
+    if times is not None and lines:
+        subtitles.append((times, "\n".join(lines)))
+    return subtitles
+
+def write_trimmed_srt(srt_file, end_time, output_file):
+    """Copy an SRT file, dropping or shortening entries that run past end_time."""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        index = 0
+        for (start, end), text in read_srt(srt_file):
+            if start >= end_time:
+                continue
+            index += 1
+            f.write(f"{index}\n{_format_srt_time(start)} --> {_format_srt_time(min(end, end_time))}\n{text}\n\n")
+
+def probe_video(video_file):
+    """Read a video's duration and frame size with a single ffprobe call instead of opening a clip."""
+    output = subprocess.check_output([
+        'ffprobe', '-v', 'quiet',
+        '-select_streams', 'v:0',
+        '-show_entries', 'format=duration:stream=width,height',
+        '-of', 'json',
+        video_file
+    ])
+    meta = json.loads(output)
+    stream = meta['streams'][0]
+    return float(meta['format']['duration']), stream['width'], stream['height']
+
+def burn_subtitles_with_ffmpeg(exported_video_file, srt_file, font_path, output_video_file, threads, encoder):
+    """Burn subtitles with ffmpeg's libass-based subtitles filter instead of compositing frames in Python."""
+    duration, _, video_height = probe_video(exported_video_file)
+
+    # Same 60px text, placed roughly two thirds of the way down like the MoviePy renderer
+    font_size = max(1, round(60 * ass_play_res_y / video_height))
+    style = ",".join([
+        f"FontName={_load_font(font_path, 60).getname()[0]}",
+        f"FontSize={font_size}",
+        "PrimaryColour=&H00000000",
+        "OutlineColour=&H00FFFFFF",  # With BorderStyle=3 this is the box colour
+        "BorderStyle=3",
+        "Outline=2",
+        "Shadow=0",
+        "Alignment=2",
+        f"MarginV={ass_play_res_y // 3 - font_size}",
+    ])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Subtitles end 1 second before the video does
+        trimmed_srt = os.path.join(temp_dir, 'subtitles.srt')
+        write_trimmed_srt(srt_file, max(0, duration - 1), trimmed_srt)
+
+        subtitles_filter = (
+            f"subtitles=filename={_escape_filter_value(trimmed_srt)}"
+            f":fontsdir={_escape_filter_value(str(Path(font_path).parent))}"
+            f":force_style={_escape_filter_value(style)}"
         )
-        
-        text_width, text_height = text_clip.size
-        
-        # Use original padding logic
-        if any('\u0E00' <= char <= '\u0E7F' for char in txt):  # Thai
-            h_padding = 60
-        else:
-            h_padding = 50
-            
-        size = (text_width + h_padding, text_height + 30)
-        bg_array = create_rounded_rectangle(size, radius=15, color=(255, 255, 255))
-        bg_clip = ImageClip(bg_array)
-        composite_clip = CompositeVideoClip([
-            bg_clip.set_position(('center', 'center')), 
-            text_clip.set_position(('center', 'center'))
-        ], size=size)
-        
-        return composite_clip.set_duration(text_clip.duration)
+        def encode(codec, settings):
+            ffmpeg_command = [
+                'ffmpeg', '-y',
+                '-i', exported_video_file,
+                '-vf', subtitles_filter,
+                '-c:v', codec, '-preset', settings['preset'], *settings['ffmpeg_params'],
+                '-c:a', 'copy',
+                '-threads', str(threads),
+                output_video_file
+            ]
+            return subprocess.run(ffmpeg_command, capture_output=True, text=True)
+
+        codec, settings = encoder
+        result = encode(codec, settings)
+        fallback_codec, fallback_settings = video_encoders[-1]
+        if result.returncode != 0 and codec != fallback_codec:
+            # Hardware encoders limit concurrent sessions, so a parallel render can still be refused
+            logging.warning(f"{codec} failed for {output_video_file}, retrying with {fallback_codec}")
+            result = encode(fallback_codec, fallback_settings)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()}")
+
+def make_subtitle_overlay(subtitles, images, pos_y, end_time):
+    """Build a MoviePy fl() filter that alpha-blends each subtitle image onto the frame in place of compositing."""
+    subtitles = sorted(subtitles)
+    starts = [start for (start, _), _ in subtitles]
+    # Split every image into float colour and alpha once, rather than on every frame
+    layers = {
+        txt: (image[..., :3].astype(np.float32), image[..., 3:4].astype(np.float32) / 255.0)
+        for txt, image in images.items()
+    }
+
+    def overlay(get_frame, t):
+        frame = get_frame(t)
+        if t >= end_time:
+            return frame
+        index = bisect.bisect_right(starts, t) - 1
+        if index < 0:
+            return frame
+        (start, end), txt = subtitles[index]
+        if t >= end:
+            return frame
+
+        rgb, alpha = layers[txt]
+        frame_height, frame_width = frame.shape[:2]
+        height, width = alpha.shape[:2]
+        x = (frame_width - width) // 2
+
+        # Only blend the part of the subtitle that lands inside the frame
+        x0, y0 = max(x, 0), max(pos_y, 0)
+        x1, y1 = min(x + width, frame_width), min(pos_y + height, frame_height)
+        if x0 >= x1 or y0 >= y1:
+            return frame
+        sub_rgb = rgb[y0 - pos_y:y1 - pos_y, x0 - x:x1 - x]
+        sub_alpha = alpha[y0 - pos_y:y1 - pos_y, x0 - x:x1 - x]
+
+        # The reader may hand back its own buffer, so blend into a copy
+        frame = frame.copy()
+        region = frame[y0:y1, x0:x1]
+        frame[y0:y1, x0:x1] = (sub_rgb * sub_alpha + region * (1 - sub_alpha)).astype(np.uint8)
+        return frame
 
-def process_video(exported_video_file):
+    return overlay
+
+def process_video(exported_video_file, renderer='moviepy', threads=1, encoder=video_encoders[-1]):
     video_file_name = Path(exported_video_file).name
     language_code = video_file_name.split('_')[-1].split('.')[0]
     if language_code in languages_to_skip:
@@ -123,34 +349,63 @@ def process_video(exported_video_file):
 
     try:
         output_video_file = str(export_dir / video_file_name.replace('.mp4', '_Sub.mp4'))
+        if renderer == 'ffmpeg':
+            burn_subtitles_with_ffmpeg(exported_video_file, matching_srt_file, select_font(language_code), output_video_file, threads, encoder)
+            logging.info(f"Subtitle burned into {output_video_file}")
+            return
+
+        # Only the MoviePy renderer needs MoviePy, so skipped videos and the ffmpeg path never import it
+        from moviepy.editor import VideoFileClip
+
         video_clip = VideoFileClip(exported_video_file)
         font_path = select_font(language_code)
 
-        subtitles_generator = lambda txt: create_text_clip_with_background(txt, fontsize=60, font_name=font_path, text_color='black')
-        subtitles_clip = SubtitlesClip(matching_srt_file, make_textclip=subtitles_generator)
+        # Parse the SRT once and render each distinct line up front
+        subtitles = read_srt(matching_srt_file)
+        images = {
+            txt: create_subtitle_image(txt, fontsize=60, font_name=font_path, text_color='black')
+            for txt in {txt for _, txt in subtitles}
+        }
         pos_y = (2 * video_clip.size[1]) // 3
         
         # Calculate the end time for subtitles (1 second before video ends instead of 3)
         subtitle_end_time = max(0, video_clip.duration - 1)
         
-        # Trim the subtitles clip to end 1 second before the video ends
-        subtitles_clip = subtitles_clip.subclip(0, subtitle_end_time)
-        
-        subtitles_clip = subtitles_clip.set_position(('center', pos_y))
-
-        video_with_subs = CompositeVideoClip([video_clip, subtitles_clip])
-        video_with_subs.write_videofile(output_video_file, codec='libx264', audio_codec='aac')
+        # Blend the subtitles straight into each decoded frame; the audio is carried over untouched
+        video_with_subs = video_clip.fl(make_subtitle_overlay(subtitles, images, pos_y, subtitle_end_time))
+        write_video(video_with_subs, output_video_file, threads, encoder)
 
         logging.info(f"Subtitle burned into {output_video_file}")
     except Exception as e:
         logging.error(f"Failed to process video {video_file_name} due to {e}")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Burn subtitles into the exported videos")
+    parser.add_argument("--renderer", choices=["moviepy", "ffmpeg"], default="moviepy",
+                        help="moviepy draws the rounded subtitle boxes; ffmpeg renders with libass and is much faster")
+    args = parser.parse_args()
+
     if not exported_video_files:
         logging.info("No video files found in the directory.")
     elif not srt_files:
         logging.info("No subtitle files found in the directory.")
     else:
         logging.info("OK, hold on, we are getting there! 小程序正在努力运转中～")
-        for video_file in exported_video_files:
-            process_video(video_file)
+        # Probe the hardware encoders here once rather than in every worker process,
+        # using the ffmpeg build that will do the encoding
+        if args.renderer == 'ffmpeg':
+            ffmpeg_binary = 'ffmpeg'
+        else:
+            from moviepy.config import get_setting
+            ffmpeg_binary = get_setting("FFMPEG_BINARY")
+        encoder = get_video_encoder(ffmpeg_binary)
+        max_workers = get_worker_count(len(exported_video_files))
+        # Split the cores between the workers so parallel encodes don't oversubscribe the CPU
+        threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+        logging.info(f"Rendering {len(exported_video_files)} videos with {max_workers} parallel workers, "
+                     f"{threads_per_worker} encoder threads each")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # process_video logs its own failures, so just wait for every job
+            render = functools.partial(process_video, renderer=args.renderer,
+                                       threads=threads_per_worker, encoder=encoder)
+            list(executor.map(render, exported_video_files))
@@ -1,8 +1,10 @@
 import os
+import errno
 import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(
@@ -14,6 +16,9 @@ logging.basicConfig(
     ]
 )
 
+# Moves are mostly waiting on the filesystem, so a few threads overlap them nicely
+MAX_MOVE_WORKERS = 8
+
 class ProjectOrganizer:
     def __init__(self):
         # Get the base directory (where this script is located)
@@ -75,17 +80,20 @@ class ProjectOrganizer:
             for dir_path in subdirs.values():
                 dir_path.mkdir(exist_ok=True)
 
+            # List every source directory once up front
+            source_files = self._scan_sources()
+
             # Process video files
-            self._process_video_files(subdirs['video'])
+            self._process_video_files(subdirs['video'], source_files)
             
             # Process audio files
-            self._process_audio_files(subdirs['audio'])
+            self._process_audio_files(subdirs['audio'], source_files)
             
             # Process subtitle files
-            self._process_subtitle_files(subdirs['subtitles'])
+            self._process_subtitle_files(subdirs['subtitles'], source_files)
             
             # Process translation files
-            self._process_translation_files(subdirs['translations'])
+            self._process_translation_files(subdirs['translations'], source_files)
             
             logging.info(f"Successfully organized project: {project_name}")
             return True
@@ -94,65 +102,65 @@ class ProjectOrganizer:
             logging.error(f"Error organizing project {project_name}: {e}")
             return False
 
-    def _process_video_files(self, dest_dir):
+    def _scan_sources(self):
+        """Scan each source directory once, grouping its files by lower-case extension."""
+        source_files = {}
+        for name, source_dir in self.dirs['source'].items():
+            files_by_extension = {}
+            with os.scandir(source_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        extension = os.path.splitext(entry.name)[1].lower()
+                        files_by_extension.setdefault(extension, []).append(Path(entry.path))
+            source_files[name] = files_by_extension
+        return source_files
+
+    def _move_file(self, source_file, dest_dir, expected_extensions, label):
+        """Validate and move a single file into dest_dir."""
+        try:
+            self._validate_file(source_file, expected_extensions)
+            dest_path = dest_dir / source_file.name
+            try:
+                # Same filesystem: a single rename, however big the file is
+                os.replace(source_file, dest_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(str(source_file), str(dest_path))
+            logging.info(f"Moved {label} file to: {dest_path}")
+        except Exception as e:
+            logging.error(f"Error processing {label} file {source_file}: {e}")
+
+    def _move_files(self, files, dest_dir, expected_extensions, label):
+        """Move files into dest_dir concurrently; errors are logged per file."""
+        with ThreadPoolExecutor(max_workers=MAX_MOVE_WORKERS) as executor:
+            for source_file in files:
+                executor.submit(self._move_file, source_file, dest_dir, expected_extensions, label)
+
+    def _process_video_files(self, dest_dir, source_files):
         """Process and organize video files."""
         # Process files from video directory
-        video_files = list(self.dirs['source']['video'].glob('*.mp4'))
-        for video_file in video_files:
-            try:
-                self._validate_file(video_file, ['.mp4'])
-                dest_path = dest_dir / video_file.name
-                shutil.move(str(video_file), str(dest_path))
-                logging.info(f"Moved video file to: {dest_path}")
-            except Exception as e:
-                logging.error(f"Error processing video file {video_file}: {e}")
+        video_files = source_files['video'].get('.mp4', [])
+        self._move_files(video_files, dest_dir, ['.mp4'], 'video')
 
         # Process files from export directory
-        export_files = list(self.dirs['source']['export'].glob('*.mp4'))
-        for export_file in export_files:
-            try:
-                self._validate_file(export_file, ['.mp4'])
-                dest_path = dest_dir / export_file.name
-                shutil.move(str(export_file), str(dest_path))
-                logging.info(f"Moved export file to: {dest_path}")
-            except Exception as e:
-                logging.error(f"Error processing export file {export_file}: {e}")
-
-    def _process_audio_files(self, dest_dir):
+        export_files = source_files['export'].get('.mp4', [])
+        self._move_files(export_files, dest_dir, ['.mp4'], 'export')
+
+    def _process_audio_files(self, dest_dir, source_files):
         """Process and organize audio files."""
-        audio_files = list(self.dirs['source']['audio'].glob('*.mp3'))
-        for audio_file in audio_files:
-            try:
-                self._validate_file(audio_file, ['.mp3'])
-                dest_path = dest_dir / audio_file.name
-                shutil.move(str(audio_file), str(dest_path))
-                logging.info(f"Moved audio file to: {dest_path}")
-            except Exception as e:
-                logging.error(f"Error processing audio file {audio_file}: {e}")
-
-    def _process_subtitle_files(self, dest_dir):
+        audio_files = source_files['audio'].get('.mp3', [])
+        self._move_files(audio_files, dest_dir, ['.mp3'], 'audio')
+
+    def _process_subtitle_files(self, dest_dir, source_files):
         """Process and organize subtitle files."""
-        srt_files = list(self.dirs['source']['srt'].glob('*.srt'))
-        for srt_file in srt_files:
-            try:
-                self._validate_file(srt_file, ['.srt'])
-                dest_path = dest_dir / srt_file.name
-                shutil.move(str(srt_file), str(dest_path))
-                logging.info(f"Moved subtitle file to: {dest_path}")
-            except Exception as e:
-                logging.error(f"Error processing subtitle file {srt_file}: {e}")
-
-    def _process_translation_files(self, dest_dir):
+        srt_files = source_files['srt'].get('.srt', [])
+        self._move_files(srt_files, dest_dir, ['.srt'], 'subtitle')
+
+    def _process_translation_files(self, dest_dir, source_files):
         """Process and organize translation files."""
-        translation_files = list(self.dirs['source']['translations'].glob('*.txt'))
-        for trans_file in translation_files:
-            try:
-                self._validate_file(trans_file, ['.txt'])
-                dest_path = dest_dir / trans_file.name
-                shutil.move(str(trans_file), str(dest_path))
-                logging.info(f"Moved translation file to: {dest_path}")
-            except Exception as e:
-                logging.error(f"Error processing translation file {trans_file}: {e}")
+        translation_files = source_files['translations'].get('.txt', [])
+        self._move_files(translation_files, dest_dir, ['.txt'], 'translation')
 
 def main():
     try:
@@ -2,12 +2,38 @@ import streamlit as st
 import os
 from pathlib import Path
 import time
+import asyncio
 from openai import OpenAI
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Short ad copy doesn't need full GPT-4; the mini model is much faster and cheaper
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_LABEL = "OpenAI GPT-4o mini"
+
+# Languages offered for translation
+LANGUAGES = {
+    "JP": "Japanese",
+    "CN": "Traditional Chinese",
+    "DE": "German",
+    "IN": "Hindi",
+    "FR": "French",
+    "KR": "Korean",
+    "BR": "Brazilian Portuguese",
+    "IT": "Italian",
+    "ES": "Spanish",
+    "ID": "Indonesian",
+    "TR": "Turkish",
+    "PH": "Filipino",
+    "PL": "Polish",
+    "SA": "Arabic",
+    "MY": "Malay",
+    "VN": "Vietnamese",
+    "TH": "Thai"
+}
+
 # Initialize session state for authentication and API keys
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -61,6 +87,59 @@ def save_api_keys():
     st.session_state.deepseek_api_key = st.session_state.deepseek_key_input
     st.success("API keys saved successfully!")
 
+@st.cache_resource
+def get_openai_client(api_key):
+    """Keep one OpenAI client per API key so its connection pool stays warm across reruns"""
+    return OpenAI(api_key=api_key)
+
+def get_system_message(lang_name):
+    """Build the translator system prompt for a target language"""
+    return f"""You are a professional translator for {lang_name}. Follow these guidelines:
+1. Translate the text naturally as a native {lang_name} speaker would express it
+2. Adapt idioms and expressions to local equivalents in {lang_name}
+3. Use appropriate formality levels for the target culture
+4. Keep branded terms and proper nouns in English
+5. Return the translation as a single continuous paragraph with no line breaks
+6. Provide ONLY the translation, no explanations or notes"""
+
+async def translate_one(client, lang_code, lang_name, text):
+    """Translate text into one language, returning (lang_code, translation, error)"""
+    try:
+        # The cached client is synchronous, so run each request in a worker thread
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": get_system_message(lang_name)},
+                {"role": "user", "content": text}
+            ],
+            temperature=0.3,
+            max_tokens=1000
+        )
+        return lang_code, response.choices[0].message.content.strip(), None
+    except Exception as e:
+        return lang_code, f"Error: {str(e)}", e
+
+async def translate_all(client, text, lang_codes, progress_bar, status_text):
+    """Run all translations concurrently, showing each result and updating progress as it finishes"""
+    translations = {}
+    tasks = [translate_one(client, lang_code, LANGUAGES[lang_code], text) for lang_code in lang_codes]
+    status_text.text(f"Translating to {len(tasks)} languages...")
+    # Reserve a slot per language so results keep the selected order however they arrive
+    st.subheader("Translations")
+    slots = {lang_code: st.empty() for lang_code in lang_codes}
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        lang_code, translation, error = await task
+        if error:
+            st.error(f"Error translating to {LANGUAGES[lang_code]}: {str(error)}")
+        translations[lang_code] = translation
+        with slots[lang_code].container():
+            with st.expander(f"{LANGUAGES[lang_code]} ({lang_code})"):
+                st.write(translation)
+        progress_bar.progress(done / len(tasks))
+        status_text.text(f"Translated {done} of {len(tasks)} languages...")
+    return translations
+
 def main():
     st.title("Translation App")
     
@@ -91,37 +170,16 @@ def main():
     # Text input
     text_to_translate = st.text_area("Enter text to translate:", height=150)
     
-    # Language selection
-    languages = {
-        "JP": "Japanese",
-        "CN": "Traditional Chinese",
-        "DE": "German",
-        "IN": "Hindi",
-        "FR": "French",
-        "KR": "Korean",
-        "BR": "Brazilian Portuguese",
-        "IT": "Italian",
-        "ES": "Spanish",
-        "ID": "Indonesian",
-        "TR": "Turkish",
-        "PH": "Filipino",
-        "PL": "Polish",
-        "SA": "Arabic",
-        "MY": "Malay",
-        "VN": "Vietnamese",
-        "TH": "Thai"
-    }
-    
     # Model selection
     model_choice = st.radio(
         "Select Translation Model:",
-        ["OpenAI GPT-4", "DeepSeek"],
+        [OPENAI_LABEL, "DeepSeek"],
         index=0
     )
     
     selected_languages = st.multiselect(
         "Select languages to translate to:",
-        options=list(languages.keys()),
+        options=list(LANGUAGES.keys()),
         default=["JP", "CN", "DE"]
     )
     
@@ -135,17 +193,15 @@ def main():
             return
             
         # Check if API key is available
-        if model_choice == "OpenAI GPT-4" and not st.session_state.openai_api_key:
+        if model_choice == OPENAI_LABEL and not st.session_state.openai_api_key:
             st.error("Please enter your OpenAI API key in the API Key Management section")
             return
         elif model_choice == "DeepSeek" and not st.session_state.deepseek_api_key:
             st.error("Please enter your DeepSeek API key in the API Key Management section")
             return
             
-        # Initialize appropriate client based on model choice
-        if model_choice == "OpenAI GPT-4":
-            client = OpenAI(api_key=st.session_state.openai_api_key)
-        else:
+        # Only OpenAI is wired up so far
+        if model_choice != OPENAI_LABEL:
             # DeepSeek implementation would go here
             st.error("DeepSeek integration coming soon!")
             return
@@ -154,47 +210,14 @@ def main():
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        # Process translations
-        translations = {}
-        for i, lang_code in enumerate(selected_languages):
-            lang_name = languages[lang_code]
-            status_text.text(f"Translating to {lang_name}...")
-            
-            try:
-                # Get enhanced system message
-                system_message = f"""You are a professional translator for {lang_name}. Follow these guidelines:
-1. Translate the text naturally as a native {lang_name} speaker would express it
-2. Adapt idioms and expressions to local equivalents in {lang_name}
-3. Use appropriate formality levels for the target culture
-4. Keep branded terms and proper nouns in English
-5. Return the translation as a single continuous paragraph with no line breaks
-6. Provide ONLY the translation, no explanations or notes"""
-                
-                response = client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": system_message},
-                        {"role": "user", "content": text_to_translate}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1000
-                )
-                
-                translation = response.choices[0].message.content.strip()
-                translations[lang_code] = translation
-                
-            except Exception as e:
-                st.error(f"Error translating to {lang_name}: {str(e)}")
-                translations[lang_code] = f"Error: {str(e)}"
-            
-            # Update progress
-            progress_bar.progress((i + 1) / len(selected_languages))
-        
-        # Display results
-        st.subheader("Translations")
-        for lang_code, translation in translations.items():
-            with st.expander(f"{languages[lang_code]} ({lang_code})"):
-                st.write(translation)
+        # Process translations concurrently, displaying each one as it finishes
+        asyncio.run(translate_all(
+            get_openai_client(st.session_state.openai_api_key),
+            text_to_translate,
+            selected_languages,
+            progress_bar,
+            status_text
+        ))
         
         # Clear progress indicators
         progress_bar.empty()